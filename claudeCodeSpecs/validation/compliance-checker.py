@@ -477,16 +477,14 @@ class ComplianceChecker:
 
         # Test valid commands
         for cmd in valid_commands:
-            validation_result = self.schema_validator.validate_command(cmd)
-            if validation_result.is_valid:
+            if self.schema_validator.is_valid(cmd, SchemaType.COMMANDS):
                 success, responses = wrapper.send_command(cmd, timeout=5.0)
                 if success:
                     valid_count += 1
 
         # Test invalid commands (should be rejected)
         for cmd in invalid_commands:
-            validation_result = self.schema_validator.validate_command(cmd)
-            if not validation_result.is_valid:
+            if not self.schema_validator.is_valid(cmd, SchemaType.COMMANDS):
                 success, responses = wrapper.send_command(cmd, timeout=5.0)
                 # Check if wrapper properly rejected invalid command
                 if not success or any(r.get("event") == "error" for r in responses):
@@ -10,10 +10,11 @@ Requirements satisfied: 5.1, 5.2, 5.3 - Schema validation with detailed error re
 """
 
 import json
+import mmap
 import os
 import sys
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 
@@ -21,6 +22,147 @@ import jsonschema
 from jsonschema.validators import Draft202012Validator
 from jsonschema.exceptions import ValidationError, SchemaError
 
+try:
+    import orjson
+except ImportError:
+    # orjson not available, fall back to stdlib json
+    orjson = None
+
+try:
+    import fastjsonschema
+except ImportError:
+    # fastjsonschema not available, compiled validators use jsonschema
+    fastjsonschema = None
+
+# Exceptions raised by the callables returned from get_compiled_validator()
+COMPILED_VALIDATION_ERRORS = (ValidationError,) + (
+    (fastjsonschema.JsonSchemaValueException,) if fastjsonschema is not None else ()
+)
+
+
+def _load_json_file(path: Path) -> Any:
+    """Parse a JSON file, reading it through a read-only mmap when orjson is available"""
+    if orjson is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty or non-mappable files: fall back to a regular read
+            return orjson.loads(f.read())
+
+        with mm:
+            view = memoryview(mm)
+            try:
+                return orjson.loads(view)
+            finally:
+                view.release()
+
+
+# Legacy command fields that trigger migration warnings
+_LEGACY_COMMAND_KEYS = frozenset({"command", "working_directory"})
+_LEGACY_WARN = {
+    "command": "Using legacy command format - consider migrating to 'action' field",
+    "working_directory": "Field 'working_directory' is deprecated - use 'options.cwd' instead",
+}
+
+
+def _fmt_path(path) -> str:
+    """Format a jsonschema error path (a deque) as a dotted string, or "root" if empty"""
+    if not path:
+        return "root"
+    return ".".join(p if isinstance(p, str) else str(p) for p in path)
+
+
+# Keywords the specialized command validators know how to evaluate; a property
+# using anything else (e.g. $ref) is left to the generic validator
+_SIMPLE_KEYWORDS = frozenset({"type", "const", "enum", "minLength", "description"})
+_SIMPLE_TYPES = {"string": str, "boolean": bool, "object": dict}
+
+
+def _compile_property_check(subschema: Dict[str, Any]) -> Optional[Callable[[Any], bool]]:
+    """Build a predicate for a simple property subschema, or None if it is not simple"""
+    if not subschema.keys() <= _SIMPLE_KEYWORDS:
+        return None
+
+    py_type = _SIMPLE_TYPES.get(subschema.get("type"))
+    if "type" in subschema and py_type is None:
+        return None
+
+    const = subschema.get("const")
+    has_const = "const" in subschema
+    enum = subschema.get("enum")
+    min_length = subschema.get("minLength")
+
+    def check(value: Any) -> bool:
+        if py_type is not None and not isinstance(value, py_type):
+            return False
+        if has_const and value != const:
+            return False
+        if enum is not None and value not in enum:
+            return False
+        if min_length is not None and (not isinstance(value, str) or len(value) < min_length):
+            return False
+        return True
+
+    return check
+
+
+def _build_action_validators(schema: Dict[str, Any]) -> Dict[str, Callable[[Dict[str, Any]], bool]]:
+    """
+    Partially evaluate the command schema into one fast-path predicate per action.
+
+    Each predicate only confirms that a command matches its closed action
+    definition. A False result means "not proven valid" and the caller must
+    fall back to the generic validator, which also produces the error details.
+
+    Args:
+        schema: Loaded commands schema
+
+    Returns:
+        Mapping of action name to fast-path predicate
+    """
+    definitions = schema.get("$defs", {})
+    branches = []
+    for branch in schema.get("oneOf", []):
+        ref = branch.get("$ref", "")
+        if not ref.startswith("#/$defs/"):
+            return {}
+        branches.append(definitions.get(ref[len("#/$defs/"):], {}))
+
+    # Keys required by branches without an action discriminator (legacy format);
+    # an action definition declaring one of them could match two branches
+    open_required = set()
+    for definition in branches:
+        if "const" not in definition.get("properties", {}).get("action", {}):
+            open_required.update(definition.get("required", []))
+
+    validators: Dict[str, Callable[[Dict[str, Any]], bool]] = {}
+    for definition in branches:
+        properties = definition.get("properties", {})
+        action = properties.get("action", {}).get("const")
+        if (action is None or definition.get("additionalProperties") is not False
+                or open_required & properties.keys()):
+            continue
+
+        checks = {name: _compile_property_check(sub) for name, sub in properties.items()}
+        required = frozenset(definition.get("required", []))
+
+        def validate(data: Dict[str, Any], checks=checks, required=required) -> bool:
+            if not required <= data.keys():
+                return False
+            for key, value in data.items():
+                check = checks.get(key)
+                if check is None or not check(value):
+                    return False
+            return True
+
+        validators[action] = validate
+
+    return validators
+
 
 class SchemaType(Enum):
     """Enumeration of available schema types for validation"""
@@ -29,6 +171,14 @@ class SchemaType(Enum):
     STATES = "states"
 
 
+# Schema file backing each schema type, relative to the schemas directory
+_SCHEMA_FILES = {
+    SchemaType.COMMANDS: "commands.json",
+    SchemaType.EVENTS: "events.json",
+    SchemaType.STATES: "states.json"
+}
+
+
 @dataclass
 class ValidationResult:
     """Result of schema validation with detailed error information"""
@@ -57,13 +207,15 @@ class SchemaValidator:
     validation of wrapper implementations against protocol specifications.
     """
 
-    def __init__(self, schemas_dir: Optional[Path] = None):
+    def __init__(self, schemas_dir: Optional[Path] = None, use_fastjsonschema: bool = False):
         """
         Initialize validator with schema directory.
 
         Args:
             schemas_dir: Path to directory containing JSON schemas.
                         Defaults to claudeCodeSpecs/schemas/
+            use_fastjsonschema: Also code-generate a fastjsonschema validator per
+                        schema for get_compiled_validator(), when installed
         """
         if schemas_dir is None:
             # Default to schemas directory relative to this file
@@ -73,39 +225,79 @@ class SchemaValidator:
         self.schemas_dir = Path(schemas_dir)
         self.schemas: Dict[SchemaType, Dict[str, Any]] = {}
         self.validators: Dict[SchemaType, Draft202012Validator] = {}
+        self._action_validators: Dict[str, Callable[[Dict[str, Any]], bool]] = {}
+        self.use_fastjsonschema = use_fastjsonschema and fastjsonschema is not None
+        self._compiled: Dict[SchemaType, Callable[[Any], Any]] = {}
 
-        # Load all available schemas on initialization
-        self._load_schemas()
+        # Schemas are loaded on first use; track which ones were attempted
+        self._loaded: Set[SchemaType] = set()
 
     def _load_schemas(self) -> None:
         """Load and validate all JSON schemas from the schemas directory"""
-        schema_files = {
-            SchemaType.COMMANDS: "commands.json",
-            SchemaType.EVENTS: "events.json",
-            SchemaType.STATES: "states.json"
-        }
+        for schema_type in _SCHEMA_FILES:
+            self._ensure_loaded(schema_type)
+
+    def _ensure_loaded(self, schema_type: SchemaType) -> None:
+        """
+        Load and compile a single schema the first time it is needed.
+
+        Args:
+            schema_type: Type of schema to load
+        """
+        if schema_type in self._loaded:
+            return
+
+        schema_path = self.schemas_dir / _SCHEMA_FILES[schema_type]
+
+        if not schema_path.exists():
+            print(f"Warning: Schema file {schema_path} not found, skipping {schema_type.value}")
+            self._loaded.add(schema_type)
+            return
 
-        for schema_type, filename in schema_files.items():
-            schema_path = self.schemas_dir / filename
+        try:
+            schema, validator = self._compile_one(schema_path)
+        except (json.JSONDecodeError, SchemaError) as e:
+            print(f"Error loading schema {schema_path}: {e}")
+            sys.exit(1)
+
+        self.schemas[schema_type] = schema
+        self.validators[schema_type] = validator
 
-            if not schema_path.exists():
-                print(f"Warning: Schema file {schema_path} not found, skipping {schema_type.value}")
-                continue
+        # Specialize command validation for the known, fixed action shapes
+        if schema_type == SchemaType.COMMANDS:
+            self._action_validators = _build_action_validators(schema)
 
+        if self.use_fastjsonschema:
             try:
-                with open(schema_path, 'r', encoding='utf-8') as f:
-                    schema = json.load(f)
+                # Formats and defaults are off to match Draft202012Validator behaviour
+                self._compiled[schema_type] = fastjsonschema.compile(
+                    schema, use_default=False, use_formats=False
+                )
+            except fastjsonschema.JsonSchemaDefinitionException as e:
+                print(f"Warning: fastjsonschema cannot compile {schema_path}, using jsonschema: {e}")
+
+        # Only mark as loaded once fully stored so concurrent callers never see a
+        # half-loaded schema; a duplicate load in a race is harmless
+        self._loaded.add(schema_type)
 
-                # Validate the schema itself
-                Draft202012Validator.check_schema(schema)
+    @staticmethod
+    def _compile_one(schema_path: Path) -> Tuple[Dict[str, Any], Draft202012Validator]:
+        """
+        Parse a schema file, check it against the metaschema and build its validator.
 
-                # Store schema and create validator
-                self.schemas[schema_type] = schema
-                self.validators[schema_type] = Draft202012Validator(schema)
+        Args:
+            schema_path: Path to the JSON schema file
 
-            except (json.JSONDecodeError, SchemaError) as e:
-                print(f"Error loading schema {schema_path}: {e}")
-                sys.exit(1)
+        Returns:
+            Tuple of the raw schema and its compiled validator
+
+        Raises:
+            json.JSONDecodeError: If the file is not valid JSON
+            SchemaError: If the schema itself is invalid
+        """
+        schema = _load_json_file(schema_path)
+        Draft202012Validator.check_schema(schema)
+        return schema, Draft202012Validator(schema)
 
     def validate_command(self, command_data: Union[str, Dict[str, Any]]) -> ValidationResult:
         """
@@ -159,6 +351,7 @@ class SchemaValidator:
         validated_data = None
 
         # Check if schema is available
+        self._ensure_loaded(schema_type)
         if schema_type not in self.validators:
             errors.append(f"Schema {schema_type.value} not available")
             return ValidationResult(False, schema_type, errors, warnings)
@@ -173,6 +366,11 @@ class SchemaValidator:
             errors.append(f"Invalid JSON: {e}")
             return ValidationResult(False, schema_type, errors, warnings)
 
+        # Fast path: commands matching a known action shape are valid as-is
+        if schema_type == SchemaType.COMMANDS and self._matches_known_action(validated_data):
+            self._check_warnings(validated_data, schema_type, warnings)
+            return ValidationResult(True, schema_type, errors, warnings, validated_data)
+
         # Validate against schema
         validator = self.validators[schema_type]
         validation_errors = list(validator.iter_errors(validated_data))
@@ -180,14 +378,8 @@ class SchemaValidator:
         if validation_errors:
             for error in validation_errors:
                 # Create detailed error message with path and context
-                error_path = " -> ".join(str(p) for p in error.absolute_path) if error.absolute_path else "root"
-                error_msg = f"At {error_path}: {error.message}"
-
-                # Add context about failed value if available
-                if hasattr(error, 'instance'):
-                    error_msg += f" (value: {error.instance})"
-
-                errors.append(error_msg)
+                error_path = _fmt_path(error.absolute_path)
+                errors.append(f"At {error_path}: {error.message} (value: {error.instance!r})")
 
         # Check for potential warnings (deprecated fields, etc.)
         self._check_warnings(validated_data, schema_type, warnings)
@@ -195,6 +387,44 @@ class SchemaValidator:
         is_valid = len(errors) == 0
         return ValidationResult(is_valid, schema_type, errors, warnings, validated_data)
 
+    def _matches_known_action(self, data: Any) -> bool:
+        """Check a command against the specialized validator for its action, if any"""
+        if not isinstance(data, dict):
+            return False
+        action = data.get("action")
+        action_validator = self._action_validators.get(action) if isinstance(action, str) else None
+        return action_validator is not None and action_validator(data)
+
+    def is_valid(self, data: Any, schema_type: SchemaType) -> bool:
+        """
+        Flag-mode validation: stop at the first violation and return only a bool.
+
+        Unlike _validate_data, no error messages or warnings are built, which makes
+        this the cheap check when the caller only needs the verdict.
+
+        Args:
+            data: Parsed data to validate
+            schema_type: Type of schema to validate against
+
+        Returns:
+            True if the data is valid, False if invalid or the schema is unavailable
+        """
+        self._ensure_loaded(schema_type)
+
+        if schema_type == SchemaType.COMMANDS and self._matches_known_action(data):
+            return True
+
+        compiled = self._compiled.get(schema_type)
+        if compiled is not None:
+            try:
+                compiled(data)
+            except fastjsonschema.JsonSchemaValueException:
+                return False
+            return True
+
+        validator = self.validators.get(schema_type)
+        return validator is not None and validator.is_valid(data)
+
     def _check_warnings(self, data: Dict[str, Any], schema_type: SchemaType, warnings: List[str]) -> None:
         """
         Check for potential warnings like deprecated fields or legacy patterns.
@@ -204,14 +434,18 @@ class SchemaValidator:
             schema_type: Type of schema being validated
             warnings: List to append warnings to
         """
-        if schema_type == SchemaType.COMMANDS:
+        if schema_type == SchemaType.COMMANDS and isinstance(data, dict):
+            present = data.keys() & _LEGACY_COMMAND_KEYS
+            if not present:
+                return
+
             # Check for legacy command format
-            if "command" in data and "action" not in data:
-                warnings.append("Using legacy command format - consider migrating to 'action' field")
+            if "command" in present and "action" not in data:
+                warnings.append(_LEGACY_WARN["command"])
 
             # Check for deprecated working_directory field
-            if "working_directory" in data:
-                warnings.append("Field 'working_directory' is deprecated - use 'options.cwd' instead")
+            if "working_directory" in present:
+                warnings.append(_LEGACY_WARN["working_directory"])
 
         # Add more warning checks for other schema types as needed
 
@@ -249,9 +483,32 @@ class SchemaValidator:
         Get list of available schema types that can be validated.
 
         Returns:
-            List of schema type names that are loaded and available
+            List of schema type names whose schema files are present
+        """
+        return [
+            schema_type.value for schema_type, filename in _SCHEMA_FILES.items()
+            if (self.schemas_dir / filename).exists()
+        ]
+
+    def get_compiled_validator(self, schema_type: SchemaType) -> Optional[Callable[[Any], Any]]:
+        """
+        Get a raising validator callable for a schema type.
+
+        Returns the fastjsonschema-generated function when enabled, otherwise the
+        compiled jsonschema validator's validate method. Either raises one of
+        COMPILED_VALIDATION_ERRORS on the first violation.
+
+        Args:
+            schema_type: Type of schema to validate against
+
+        Returns:
+            Validator callable or None if the schema is not available
         """
-        return [schema_type.value for schema_type in self.schemas.keys()]
+        self._ensure_loaded(schema_type)
+        if schema_type in self._compiled:
+            return self._compiled[schema_type]
+        validator = self.validators.get(schema_type)
+        return validator.validate if validator is not None else None
 
     def get_schema(self, schema_type: SchemaType) -> Optional[Dict[str, Any]]:
         """
@@ -263,6 +520,7 @@ class SchemaValidator:
         Returns:
             JSON schema dictionary or None if not available
         """
+        self._ensure_loaded(schema_type)
         return self.schemas.get(schema_type)
 
 
@@ -314,7 +572,12 @@ def main():
         result = validator.validate_state(data)
 
     # Output results
-    print(json.dumps(result.to_dict(), indent=2))
+    if orjson is not None:
+        sys.stdout.buffer.write(
+            orjson.dumps(result.to_dict(), option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+        )
+    else:
+        print(json.dumps(result.to_dict(), indent=2))
 
     # Exit with appropriate code
     sys.exit(0 if result.is_valid else 1)
@@ -14,16 +14,28 @@ import os
 import sys
 import time
 import subprocess
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
-from dataclasses import dataclass, field
+from xml.sax.saxutils import escape, quoteattr
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional, Tuple, Union
+from dataclasses import dataclass, field, is_dataclass
 from enum import Enum
 import concurrent.futures
+import contextlib
+import itertools
+import multiprocessing
 import argparse
+import asyncio
 
-from schema_validator import SchemaValidator, SchemaType, ValidationResult
+from schema_validator import SchemaValidator, SchemaType, ValidationResult, COMPILED_VALIDATION_ERRORS
 from compliance_checker import ComplianceChecker, ComplianceLevel, ComplianceReport, ComplianceStatus
 
+try:
+    import orjson
+except ImportError:
+    # orjson not available, fall back to stdlib json
+    orjson = None
+
 
 class TestSuite(Enum):
     """Available test suites for validation"""
@@ -41,6 +53,13 @@ class TestResult(Enum):
     SKIP = "skip"
 
 
+# Result values hoisted for the result-counting code
+_PASS = TestResult.PASS.value
+_FAIL = TestResult.FAIL.value
+_ERROR = TestResult.ERROR.value
+_SKIP = TestResult.SKIP.value
+
+
 @dataclass
 class TestCase:
     """Individual test case definition"""
@@ -51,6 +70,18 @@ class TestCase:
     expected_result: bool = True
     timeout: int = 30
     skip_reason: Optional[str] = None
+    parsed_data: Any = None
+    schema_type: Optional[SchemaType] = None
+    config: Optional[Dict[str, Any]] = None
+
+
+def _load_test_data(path: Union[str, Path]) -> Any:
+    """Parse a JSON test data file, using orjson when available"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
 
 
 @dataclass
@@ -69,22 +100,14 @@ class TestSuiteResult:
     overall_result: TestResult = TestResult.PASS
     summary_report: Dict[str, Any] = field(default_factory=dict)
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert test suite result to dictionary"""
-        return {
-            "suite_name": self.suite_name,
-            "start_time": self.start_time,
-            "end_time": self.end_time,
-            "duration_seconds": self.duration_seconds,
-            "total_tests": self.total_tests,
-            "passed_tests": self.passed_tests,
-            "failed_tests": self.failed_tests,
-            "error_tests": self.error_tests,
-            "skipped_tests": self.skipped_tests,
-            "overall_result": self.overall_result.value,
-            "test_results": self.test_results,
-            "summary_report": self.summary_report
-        }
+
+def _json_default(obj: Any) -> Any:
+    """Serialize dataclasses and enums for stdlib json without deep-copying them"""
+    if isinstance(obj, Enum):
+        return obj.value
+    if is_dataclass(obj):
+        return obj.__dict__
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 class TestRunner:
@@ -102,10 +125,12 @@ class TestRunner:
         Args:
             config_file: Path to test configuration file
         """
+        self.config_file = config_file
         self.config = self._load_config(config_file)
-        self.schema_validator = SchemaValidator()
+        self.schema_validator = SchemaValidator(use_fastjsonschema=True)
         self.compliance_checker = ComplianceChecker()
         self.test_cases: List[TestCase] = []
+        self._validators: Dict[SchemaType, Optional[Callable[[Any], Any]]] = {}
         self.results_dir = Path(self.config.get("results_dir", "claudeCodeSpecs/validation/results"))
         self.results_dir.mkdir(parents=True, exist_ok=True)
 
@@ -141,6 +166,21 @@ class TestRunner:
         Args:
             test_data_dir: Directory containing test JSON files
         """
+        self.test_cases.extend(self.iter_schema_tests(test_data_dir))
+
+    def iter_schema_tests(self, test_data_dir: Optional[str] = None) -> Iterator[TestCase]:
+        """
+        Lazily discover schema validation test cases from test data directory.
+
+        Cases are yielded as files are found, so execution can start before the
+        whole test data tree has been walked and parsed.
+
+        Args:
+            test_data_dir: Directory containing test JSON files
+
+        Yields:
+            Schema validation test cases
+        """
         if test_data_dir is None:
             test_data_dir = self.config.get("test_data_dir", "claudeCodeSpecs/validation/test-data")
 
@@ -157,29 +197,41 @@ class TestRunner:
         }
 
         for schema_name, schema_type in schema_types.items():
-            # Add positive test cases (valid data)
-            valid_dir = test_data_path / schema_name / "valid"
-            if valid_dir.exists():
-                for test_file in valid_dir.glob("*.json"):
-                    self.test_cases.append(TestCase(
-                        name=f"schema_{schema_name}_valid_{test_file.stem}",
-                        description=f"Validate {test_file.name} against {schema_name} schema (should pass)",
-                        test_type="schema_validation",
-                        data_file=str(test_file),
-                        expected_result=True
-                    ))
-
-            # Add negative test cases (invalid data)
-            invalid_dir = test_data_path / schema_name / "invalid"
-            if invalid_dir.exists():
-                for test_file in invalid_dir.glob("*.json"):
-                    self.test_cases.append(TestCase(
-                        name=f"schema_{schema_name}_invalid_{test_file.stem}",
-                        description=f"Validate {test_file.name} against {schema_name} schema (should fail)",
-                        test_type="schema_validation",
-                        data_file=str(test_file),
-                        expected_result=False
-                    ))
+            # One directory listing per schema classifies its valid/invalid subdirs
+            try:
+                with os.scandir(test_data_path / schema_name) as entries:
+                    subdirs = {entry.name: entry.path for entry in entries if entry.is_dir()}
+            except FileNotFoundError:
+                continue
+
+            # Positive test cases (valid data) first, then negative ones (invalid data)
+            for kind in ("valid", "invalid"):
+                if kind not in subdirs:
+                    continue
+
+                expected_result = kind == "valid"
+                with os.scandir(subdirs[kind]) as files:
+                    for entry in files:
+                        if not entry.name.endswith(".json") or not entry.is_file():
+                            continue
+
+                        yield TestCase(
+                            name=f"schema_{schema_name}_{kind}_{entry.name[:-len('.json')]}",
+                            description=f"Validate {entry.name} against {schema_name} schema (should {'pass' if expected_result else 'fail'})",
+                            test_type="schema_validation",
+                            data_file=entry.path,
+                            expected_result=expected_result,
+                            parsed_data=self._preload_test_data(entry.path),
+                            schema_type=schema_type
+                        )
+
+    @staticmethod
+    def _preload_test_data(test_file: Union[str, Path]) -> Any:
+        """Parse a test data file at discovery time; None defers errors to execution"""
+        try:
+            return _load_test_data(test_file)
+        except (ValueError, IOError):
+            return None
 
     def add_compliance_tests(self, wrapper_configs: List[Dict[str, Any]]) -> None:
         """
@@ -201,11 +253,11 @@ class TestRunner:
                 name=f"compliance_{wrapper_name}_{level.value}",
                 description=f"Compliance validation for {wrapper_name} at {level.value} level",
                 test_type="compliance_check",
-                data_file=json.dumps({
+                config={
                     "wrapper_path": wrapper_path,
                     "level": level.value,
                     "working_dir": working_dir
-                }),
+                },
                 timeout=config.get("timeout", 60)
             ))
 
@@ -224,24 +276,34 @@ class TestRunner:
             print(f"Warning: Baseline directory {baseline_path} not found")
             return
 
-        # Add regression tests based on previous compliance reports
+        # Keep only the newest baseline per (wrapper, level, config) so identical
+        # configurations are not re-run once per historical report
+        newest: Dict[tuple, Tuple[float, Path, str]] = {}
         for baseline_file in baseline_path.glob("compliance_*.json"):
             try:
                 with open(baseline_file, 'r') as f:
                     baseline_data = json.load(f)
+                mtime = baseline_file.stat().st_mtime
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"Warning: Failed to load baseline {baseline_file}: {e}")
+                continue
 
-                wrapper_name = baseline_data.get("wrapper_name", baseline_file.stem)
+            wrapper_name = baseline_data.get("wrapper_name", baseline_file.stem)
+            key = (wrapper_name, baseline_data.get("compliance_level"), baseline_data.get("config_hash"))
 
-                self.test_cases.append(TestCase(
-                    name=f"regression_{wrapper_name}",
-                    description=f"Regression test for {wrapper_name} against baseline",
-                    test_type="regression_check",
-                    data_file=str(baseline_file),
-                    timeout=90
-                ))
+            if key in newest and mtime <= newest[key][0]:
+                continue
+            newest[key] = (mtime, baseline_file, wrapper_name)
 
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Failed to load baseline {baseline_file}: {e}")
+        # Add regression tests based on previous compliance reports
+        for _, baseline_file, wrapper_name in newest.values():
+            self.test_cases.append(TestCase(
+                name=f"regression_{wrapper_name}",
+                description=f"Regression test for {wrapper_name} against baseline",
+                test_type="regression_check",
+                data_file=str(baseline_file),
+                timeout=90
+            ))
 
     def run_test_suite(self, suite_type: TestSuite,
                       wrapper_configs: Optional[List[Dict[str, Any]]] = None) -> TestSuiteResult:
@@ -255,15 +317,17 @@ class TestRunner:
         Returns:
             TestSuiteResult with comprehensive execution results
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         start_time_str = time.strftime("%Y-%m-%d %H:%M:%S")
 
         # Clear previous test cases
         self.test_cases = []
+        schema_cases: Iterator[TestCase] = iter(())
 
-        # Add appropriate test cases based on suite type
+        # Add appropriate test cases based on suite type; schema cases are
+        # discovered lazily while execution is already under way
         if suite_type in [TestSuite.SCHEMA_ONLY, TestSuite.FULL_VALIDATION]:
-            self.add_schema_tests()
+            schema_cases = self.iter_schema_tests()
 
         if suite_type in [TestSuite.COMPLIANCE_ONLY, TestSuite.FULL_VALIDATION]:
             if wrapper_configs:
@@ -272,22 +336,29 @@ class TestRunner:
         if suite_type == TestSuite.REGRESSION:
             self.add_regression_tests()
 
+        # Compile schema validators once, before any (possibly parallel) execution
+        if suite_type in [TestSuite.SCHEMA_ONLY, TestSuite.FULL_VALIDATION]:
+            for schema_type in SchemaType:
+                self._get_validator(schema_type)
+
         # Execute test cases
-        if self.config.get("parallel_execution", True) and len(self.test_cases) > 1:
-            test_results = self._run_tests_parallel()
+        test_cases = itertools.chain(schema_cases, self.test_cases)
+        if self.config.get("parallel_execution", True):
+            test_results = self._run_tests_parallel(test_cases)
         else:
-            test_results = self._run_tests_sequential()
+            test_results = self._run_tests_sequential(test_cases)
 
         # Calculate results
-        end_time = time.time()
+        end_time = time.perf_counter()
         end_time_str = time.strftime("%Y-%m-%d %H:%M:%S")
         duration = end_time - start_time
 
-        # Count results by type
-        passed = sum(1 for r in test_results if r["result"] == TestResult.PASS.value)
-        failed = sum(1 for r in test_results if r["result"] == TestResult.FAIL.value)
-        errors = sum(1 for r in test_results if r["result"] == TestResult.ERROR.value)
-        skipped = sum(1 for r in test_results if r["result"] == TestResult.SKIP.value)
+        # Count results by type in a single pass
+        counts = Counter(r["result"] for r in test_results)
+        passed = counts[_PASS]
+        failed = counts[_FAIL]
+        errors = counts[_ERROR]
+        skipped = counts[_SKIP]
 
         # Determine overall result
         if errors > 0:
@@ -320,45 +391,128 @@ class TestRunner:
 
         return suite_result
 
-    def _run_tests_sequential(self) -> List[Dict[str, Any]]:
+    def _run_tests_sequential(self, test_cases: Iterable[TestCase]) -> List[Dict[str, Any]]:
         """Execute test cases sequentially"""
         results = []
-        for i, test_case in enumerate(self.test_cases):
-            print(f"Running test {i+1}/{len(self.test_cases)}: {test_case.name}")
+        for i, test_case in enumerate(test_cases):
+            print(f"Running test {i+1}: {test_case.name}")
             result = self._execute_test_case(test_case)
             results.append(result)
         return results
 
-    def _run_tests_parallel(self) -> List[Dict[str, Any]]:
+    def _run_tests_parallel(self, test_cases: Iterable[TestCase]) -> List[Dict[str, Any]]:
         """Execute test cases in parallel"""
-        results = []
+        return asyncio.run(self._run_tests_async(test_cases))
+
+    async def _run_tests_async(self, test_cases: Iterable[TestCase]) -> List[Dict[str, Any]]:
+        """
+        Execute test cases concurrently, pulling them lazily from the iterable.
+
+        Schema validation is CPU-bound and runs in a process pool to avoid the GIL;
+        compliance and regression checks block on subprocesses and are awaited on
+        threads. Schema cases are submitted through a rolling window, so only a
+        bounded number of discovered-but-unfinished cases exist at any time.
+
+        Args:
+            test_cases: Test cases to execute
+
+        Returns:
+            List of test execution results
+        """
         max_workers = self.config.get("max_workers", 4)
+        process_workers = os.cpu_count() or 1
+        subprocess_slots = asyncio.Semaphore(max_workers)
+        schema_window = asyncio.Semaphore(process_workers * 2)
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all test cases
-            future_to_test = {
-                executor.submit(self._execute_test_case, test_case): test_case
-                for test_case in self.test_cases
-            }
+        # Size the loop's executor to the semaphore so every permitted check runs
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(max_workers=max_workers))
 
-            # Collect results as they complete
-            for future in concurrent.futures.as_completed(future_to_test):
-                test_case = future_to_test[future]
-                try:
-                    result = future.result()
-                    results.append(result)
-                    print(f"Completed: {test_case.name}")
-                except Exception as e:
-                    error_result = {
-                        "test_name": test_case.name,
-                        "test_type": test_case.test_type,
-                        "result": TestResult.ERROR.value,
-                        "error_message": f"Test execution failed: {e}",
-                        "duration": 0.0
-                    }
-                    results.append(error_result)
+        with contextlib.ExitStack() as stack:
+            process_pool = None
+            tasks = []
 
-        return results
+            for test_case in test_cases:
+                if test_case.test_type == "schema_validation":
+                    # Wait for a window slot before pulling the next case
+                    await schema_window.acquire()
+                    if process_pool is None:
+                        process_pool = stack.enter_context(self._create_process_pool(process_workers))
+                    task = self._exec_schema_async(process_pool, test_case, schema_window)
+                else:
+                    task = self._exec_compliance_async(test_case, subprocess_slots)
+
+                tasks.append(asyncio.ensure_future(task))
+
+            return list(await asyncio.gather(*tasks))
+
+    def _create_process_pool(self, max_workers: int) -> concurrent.futures.ProcessPoolExecutor:
+        """
+        Create the process pool for schema tests, sharing compiled validators when possible.
+
+        With the fork start method, workers inherit this runner (and the validators
+        run_test_suite compiled up front) copy-on-write, so nothing is pickled or
+        recompiled. Elsewhere each worker builds its own runner once.
+
+        Args:
+            max_workers: Number of worker processes
+
+        Returns:
+            Process pool executor for schema test cases
+        """
+        if "fork" in multiprocessing.get_all_start_methods():
+            # Forked children receive initargs by memory inheritance, not pickling
+            return concurrent.futures.ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_adopt_worker_runner,
+                initargs=(self,)
+            )
+
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(self.config_file,)
+        )
+
+    async def _exec_schema_async(self, process_pool: concurrent.futures.ProcessPoolExecutor,
+                                 test_case: TestCase, window: asyncio.Semaphore) -> Dict[str, Any]:
+        """Execute one schema test case in the process pool, then free its window slot"""
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                process_pool, _execute_in_worker, test_case
+            )
+        except Exception as e:
+            # The pool itself failed (e.g. a worker died)
+            return self._execution_error(test_case, e)
+        finally:
+            window.release()
+        print(f"Completed: {test_case.name}")
+        return result
+
+    async def _exec_compliance_async(self, test_case: TestCase,
+                                     semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """Execute one subprocess-bound test case once a concurrency slot is free"""
+        async with semaphore:
+            # The compliance checker drives the wrapper through blocking
+            # subprocess I/O, so it runs off the event loop thread
+            try:
+                result = await asyncio.to_thread(self._execute_test_case, test_case)
+            except Exception as e:
+                return self._execution_error(test_case, e)
+        print(f"Completed: {test_case.name}")
+        return result
+
+    @staticmethod
+    def _execution_error(test_case: TestCase, error: Exception) -> Dict[str, Any]:
+        """Build the result for a test case whose execution raised unexpectedly"""
+        return {
+            "test_name": test_case.name,
+            "test_type": test_case.test_type,
+            "result": TestResult.ERROR.value,
+            "error_message": f"Test execution failed: {error}",
+            "duration": 0.0
+        }
 
     def _execute_test_case(self, test_case: TestCase) -> Dict[str, Any]:
         """
@@ -370,7 +524,7 @@ class TestRunner:
         Returns:
             Dictionary with test execution results
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         # Check for skip conditions
         if test_case.skip_reason:
@@ -405,50 +559,63 @@ class TestRunner:
         result.update({
             "test_name": test_case.name,
             "test_type": test_case.test_type,
-            "duration": time.time() - start_time
+            "duration": time.perf_counter() - start_time
         })
 
         return result
 
     def _execute_schema_test(self, test_case: TestCase) -> Dict[str, Any]:
         """Execute schema validation test case"""
-        if not test_case.data_file or not os.path.exists(test_case.data_file):
+        if test_case.parsed_data is None and (
+                not test_case.data_file or not os.path.exists(test_case.data_file)):
             return {
                 "result": TestResult.ERROR.value,
                 "error_message": f"Test data file not found: {test_case.data_file}"
             }
 
-        # Determine schema type from file path
-        data_path = Path(test_case.data_file)
-        if "commands" in str(data_path):
-            schema_type = SchemaType.COMMANDS
-        elif "events" in str(data_path):
-            schema_type = SchemaType.EVENTS
-        elif "states" in str(data_path):
-            schema_type = SchemaType.STATES
-        else:
+        # Schema type is assigned at discovery time
+        schema_type = test_case.schema_type
+        if schema_type is None:
             return {
                 "result": TestResult.ERROR.value,
-                "error_message": "Could not determine schema type from file path"
+                "error_message": "Test case has no schema type"
             }
 
-        # Load test data
+        # Load test data, unless it was already parsed at discovery time
         try:
-            with open(test_case.data_file, 'r') as f:
-                test_data = json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
+            test_data = test_case.parsed_data
+            if test_data is None:
+                test_data = _load_test_data(test_case.data_file)
+        except (ValueError, IOError) as e:
             return {
                 "result": TestResult.ERROR.value,
                 "error_message": f"Failed to load test data: {e}"
             }
 
-        # Perform validation
-        validation_result = self.schema_validator._validate_data(test_data, schema_type)
+        # Perform validation with the shared, precompiled validator
+        validator = self._get_validator(schema_type)
+        if validator is None:
+            return {
+                "result": TestResult.ERROR.value,
+                "error_message": f"Schema {schema_type.value} not available"
+            }
 
-        # Check if result matches expectation
-        validation_passed = validation_result.is_valid
+        # Flag mode first: the compiled validator aborts at the first violation
+        try:
+            validator(test_data)
+            validation_passed = True
+        except COMPILED_VALIDATION_ERRORS:
+            validation_passed = False
         expectation_met = validation_passed == test_case.expected_result
 
+        # Only collect every error when the outcome is unexpected and needs a report
+        if expectation_met:
+            warnings = []
+            self.schema_validator._check_warnings(test_data, schema_type, warnings)
+            validation_result = ValidationResult(validation_passed, schema_type, [], warnings, test_data)
+        else:
+            validation_result = self.schema_validator._validate_data(test_data, schema_type)
+
         if expectation_met:
             return {
                 "result": TestResult.PASS.value,
@@ -469,14 +636,28 @@ class TestRunner:
                 }
             }
 
+    def _get_validator(self, schema_type: SchemaType) -> Optional[Callable[[Any], Any]]:
+        """
+        Get the compiled validator callable for a schema type, compiling it at most once.
+
+        Args:
+            schema_type: Schema type to get the validator for
+
+        Returns:
+            Raising validator callable shared by all test cases, or None if unavailable
+        """
+        if schema_type not in self._validators:
+            self._validators[schema_type] = self.schema_validator.get_compiled_validator(schema_type)
+        return self._validators[schema_type]
+
     def _execute_compliance_test(self, test_case: TestCase) -> Dict[str, Any]:
         """Execute compliance validation test case"""
         try:
-            config = json.loads(test_case.data_file)
+            config = test_case.config or {}
             wrapper_path = config["wrapper_path"]
             level = ComplianceLevel(config["level"])
             working_dir = config.get("working_dir")
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
+        except (KeyError, ValueError) as e:
             return {
                 "result": TestResult.ERROR.value,
                 "error_message": f"Invalid compliance test configuration: {e}"
@@ -523,16 +704,16 @@ class TestRunner:
 
     def _categorize_test_results(self, test_results: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
         """Categorize test results by type and status"""
-        categories = {}
-        for result in test_results:
-            test_type = result.get("test_type", "unknown")
-            status = result.get("result", "unknown")
-
-            if test_type not in categories:
-                categories[test_type] = {"pass": 0, "fail": 0, "error": 0, "skip": 0}
+        tallies = Counter(
+            (result.get("test_type", "unknown"), result.get("result", "unknown"))
+            for result in test_results
+        )
 
-            if status in categories[test_type]:
-                categories[test_type][status] += 1
+        categories = {}
+        for (test_type, status), count in tallies.items():
+            category = categories.setdefault(test_type, {_PASS: 0, _FAIL: 0, _ERROR: 0, _SKIP: 0})
+            if status in category:
+                category[status] += count
 
         return categories
 
@@ -542,8 +723,13 @@ class TestRunner:
 
         # Save JSON results
         json_file = self.results_dir / f"{suite_result.suite_name}_{timestamp}.json"
-        with open(json_file, 'w') as f:
-            json.dump(suite_result.to_dict(), f, indent=2)
+        # The dataclass is serialized directly; no intermediate dict copy
+        if orjson is not None:
+            with open(json_file, 'wb') as f:
+                f.write(orjson.dumps(suite_result, option=orjson.OPT_INDENT_2))
+        else:
+            with open(json_file, 'w') as f:
+                json.dump(suite_result, f, indent=2, default=_json_default)
 
         print(f"Results saved to: {json_file}")
 
@@ -556,9 +742,46 @@ class TestRunner:
 
     def _generate_junit_xml(self, suite_result: TestSuiteResult, timestamp: str) -> None:
         """Generate JUnit XML format for CI integration"""
-        # This would generate JUnit XML output
         xml_file = self.results_dir / f"{suite_result.suite_name}_{timestamp}.xml"
-        print(f"JUnit XML generation not yet implemented, would save to: {xml_file}")
+
+        # Streamed element by element; no DOM is built regardless of test count
+        with open(xml_file, 'wb') as f:
+            f.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+            f.write((
+                f'<testsuite name={quoteattr(suite_result.suite_name)}'
+                f' tests="{suite_result.total_tests}"'
+                f' failures="{suite_result.failed_tests}"'
+                f' errors="{suite_result.error_tests}"'
+                f' skipped="{suite_result.skipped_tests}"'
+                f' time="{suite_result.duration_seconds:.3f}"'
+                f' timestamp={quoteattr(suite_result.start_time)}>\n'
+            ).encode('utf-8'))
+
+            for result in suite_result.test_results:
+                status = result.get("result")
+                f.write((
+                    f'  <testcase classname={quoteattr(str(result.get("test_type", "unknown")))}'
+                    f' name={quoteattr(str(result.get("test_name", "")))}'
+                    f' time="{result.get("duration", 0.0):.3f}"'
+                ).encode('utf-8'))
+
+                if status == _FAIL:
+                    message = str(result.get("error_message", ""))
+                    body = f'<failure message={quoteattr(message)}>{escape(message)}</failure>'
+                elif status == _ERROR:
+                    message = str(result.get("error_message", ""))
+                    body = f'<error message={quoteattr(message)}>{escape(message)}</error>'
+                elif status == _SKIP:
+                    body = f'<skipped message={quoteattr(str(result.get("skip_reason", "")))}/>'
+                else:
+                    f.write(b'/>\n')
+                    continue
+
+                f.write(f'>\n    {body}\n  </testcase>\n'.encode('utf-8'))
+
+            f.write(b'</testsuite>\n')
+
+        print(f"JUnit XML saved to: {xml_file}")
 
     def _generate_html_report(self, suite_result: TestSuiteResult, timestamp: str) -> None:
         """Generate HTML report for human review"""
@@ -567,6 +790,27 @@ class TestRunner:
         print(f"HTML report generation not yet implemented, would save to: {html_file}")
 
 
+# Per-process runner used by ProcessPoolExecutor workers
+_worker_runner: Optional[TestRunner] = None
+
+
+def _init_worker(config_file: Optional[str]) -> None:
+    """Create the runner a worker process uses for all of its test cases"""
+    global _worker_runner
+    _worker_runner = TestRunner(config_file)
+
+
+def _adopt_worker_runner(runner: TestRunner) -> None:
+    """Use the parent's runner, inherited through fork, in a worker process"""
+    global _worker_runner
+    _worker_runner = runner
+
+
+def _execute_in_worker(test_case: TestCase) -> Dict[str, Any]:
+    """Execute a test case inside a worker process"""
+    return _worker_runner._execute_test_case(test_case)
+
+
 def main():
     """CLI interface for test runner"""
     parser = argparse.ArgumentParser(description="Claude Code Wrapper Specification Test Runner")
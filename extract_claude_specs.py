@@ -10,11 +10,25 @@ import json
 import os
 import sys
 import logging
+import mmap
 import re
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from itertools import islice
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    # orjson not available, fall back to stdlib json (json.loads also accepts bytes)
+    orjson = None
+    _loads = json.loads
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +40,89 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Number of session JSONL files analyzed
+MAX_SESSION_FILES = 10
+# Number of leading lines analyzed in each session JSONL file
+MAX_LINES_PER_SESSION_FILE = 101
+
+# Source-scanning patterns, compiled once at import; they are bytes patterns so
+# they run directly over the memory-mapped source.
+# Command actions (compared against or registered as handlers), emitted events and
+# JSON field/type pairs in claude_wrapper.py, fused into one alternation so the
+# source is scanned in a single pass
+_WRAPPER_RE = re.compile(
+    rb'action == "(?P<action>\w+)"'
+    rb'|"(?P<handler>\w+)": self\.handle_\w+'
+    rb'|"event": "(?P<event>\w+)"'
+    rb'|"(?P<field>\w+)": (?P<ftype>\w+)'
+)
+_CLASS_RE = re.compile(rb'class (\w+)')
+_DEF_RE = re.compile(rb'def (\w+)')
+
+
+@dataclass(slots=True)
+class SessionInfo:
+    """Metadata and message count for one session seen in the session files."""
+    version: Optional[str] = None
+    cwd: Optional[str] = None
+    gitBranch: Optional[str] = None
+    message_count: int = 0
+
+
+@contextmanager
+def _map_source(path: Path):
+    """Memory-map a source file read-only for regex scanning.
+
+    Args:
+        path: File to map
+
+    Yields:
+        Read-only mmap of the file, or empty bytes for an empty file
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap refuses zero-length mappings
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _scan_session_file(session_file: Path) -> Dict[str, Any]:
+    """Collect session patterns from a single JSONL file.
+
+    Runs in a worker process, so it builds and returns its own partial
+    patterns for the caller to merge.
+
+    Args:
+        session_file: Session JSONL file to scan
+
+    Returns:
+        Dictionary with tool_usage and message_types Counters and session_structures
+    """
+    patterns = {
+        "tool_usage": Counter(),
+        "message_types": Counter(),
+        "session_structures": {}
+    }
+
+    try:
+        logger.info(f"Processing session file: {session_file}")
+        with open(session_file, 'rb', buffering=1 << 20) as f:
+            # Limit analysis per file; islice stops reading once the cap is hit
+            for line_num, line in enumerate(islice(f, MAX_LINES_PER_SESSION_FILE)):
+                if line.strip():
+                    try:
+                        data = _loads(line)
+                        ClaudeCodeSpecExtractor._analyze_session_entry(data, patterns)
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"JSON decode error in {session_file}:{line_num}: {e}")
+    except Exception as e:
+        logger.error(f"Error processing {session_file}: {e}")
+
+    return patterns
+
+
 class ClaudeCodeSpecExtractor:
     """Extract and analyze Claude Code specifications from multiple sources."""
 
@@ -45,62 +142,76 @@ class ClaudeCodeSpecExtractor:
         logger.info("Analyzing Claude session data...")
 
         claude_dir = Path.home() / ".claude"
-        session_files = list(claude_dir.rglob("*.jsonl"))
+        # Stop walking once enough files are found instead of listing every session
+        session_files = list(islice(claude_dir.rglob("*.jsonl"), MAX_SESSION_FILES))
 
         patterns = {
-            "tool_usage": {},
-            "message_types": {},
+            "tool_usage": Counter(),
+            "message_types": Counter(),
             "session_structures": {},
             "error_patterns": {},
             "workflow_patterns": {}
         }
 
-        for session_file in session_files[:10]:  # Analyze first 10 files
-            try:
-                logger.info(f"Processing session file: {session_file}")
-                with open(session_file, 'r') as f:
-                    for line_num, line in enumerate(f):
-                        if line.strip():
-                            try:
-                                data = json.loads(line.strip())
-                                self._analyze_session_entry(data, patterns)
-                            except json.JSONDecodeError as e:
-                                logger.warning(f"JSON decode error in {session_file}:{line_num}: {e}")
-                        if line_num > 100:  # Limit analysis per file
-                            break
-            except Exception as e:
-                logger.error(f"Error processing {session_file}: {e}")
-
+        if session_files:
+            # Files are independent and parsing is CPU-bound; map preserves file
+            # order so the first-seen metadata of each session matches a serial scan
+            max_workers = min(len(session_files), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                for result in executor.map(_scan_session_file, session_files):
+                    self._merge_session_patterns(patterns, result)
+
+        # Plain dicts for serialization
+        patterns["tool_usage"] = dict(patterns["tool_usage"])
+        patterns["message_types"] = dict(patterns["message_types"])
+        patterns["session_structures"] = {
+            session_id: asdict(info) for session_id, info in patterns["session_structures"].items()
+        }
         self.specs_data["session_patterns"] = patterns
         logger.info(f"Analyzed {len(session_files)} session files")
 
-    def _analyze_session_entry(self, data: Dict[str, Any], patterns: Dict[str, Any]):
+    @staticmethod
+    def _merge_session_patterns(patterns: Dict[str, Any], partial: Dict[str, Any]):
+        """Merge patterns collected from one session file into the running totals."""
+        patterns["tool_usage"] += partial["tool_usage"]
+        patterns["message_types"] += partial["message_types"]
+
+        # A session can span several files; keep the first-seen metadata and sum counts
+        session_structures = patterns["session_structures"]
+        for session_id, info in partial["session_structures"].items():
+            entry = session_structures.get(session_id)
+            if entry is None:
+                session_structures[session_id] = info
+            else:
+                entry.message_count += info.message_count
+
+    @staticmethod
+    def _analyze_session_entry(data: Dict[str, Any], patterns: Dict[str, Any]):
         """Analyze individual session entry for patterns."""
 
         # Track message types
         msg_type = data.get("type", "unknown")
-        patterns["message_types"][msg_type] = patterns["message_types"].get(msg_type, 0) + 1
+        patterns["message_types"][msg_type] += 1
 
         # Analyze tool usage
         if "message" in data and isinstance(data["message"], dict):
             content = data["message"].get("content", [])
             if isinstance(content, list):
-                for item in content:
-                    if isinstance(item, dict) and item.get("type") == "tool_use":
-                        tool_name = item.get("name", "unknown")
-                        patterns["tool_usage"][tool_name] = patterns["tool_usage"].get(tool_name, 0) + 1
+                patterns["tool_usage"].update(
+                    item.get("name", "unknown") for item in content
+                    if isinstance(item, dict) and item.get("type") == "tool_use"
+                )
 
         # Track session metadata
         if "sessionId" in data:
             session_id = data["sessionId"]
-            if session_id not in patterns["session_structures"]:
-                patterns["session_structures"][session_id] = {
-                    "version": data.get("version"),
-                    "cwd": data.get("cwd"),
-                    "gitBranch": data.get("gitBranch"),
-                    "message_count": 0
-                }
-            patterns["session_structures"][session_id]["message_count"] += 1
+            session_structures = patterns["session_structures"]
+            entry = session_structures.get(session_id)
+            if entry is None:
+                entry = session_structures[session_id] = SessionInfo(
+                    data.get("version"), data.get("cwd"), data.get("gitBranch")
+                )
+            entry.message_count += 1
 
     def analyze_wrapper_interface(self):
         """Analyze claude_wrapper.py for STDIO interface specifications."""
@@ -119,30 +230,22 @@ class ClaudeCodeSpecExtractor:
             "error_handling": {}
         }
 
+        json_schemas = defaultdict(set)
+
         try:
-            with open(wrapper_file, 'r') as f:
-                content = f.read()
-
-            # Extract command handling patterns
-            command_patterns = re.findall(r'action == "(\w+)"', content)
-            for cmd in command_patterns:
-                interface_spec["input_commands"][cmd] = {"discovered_in": "handle_command"}
-
-            # Extract output event patterns
-            event_patterns = re.findall(r'"event": "(\w+)"', content)
-            for event in event_patterns:
-                interface_spec["output_events"][event] = {"discovered_in": "output_json calls"}
-
-            # Extract JSON schema patterns
-            json_patterns = re.findall(r'"(\w+)": (\w+)', content)
-            for field, field_type in json_patterns:
-                if field not in interface_spec["json_schemas"]:
-                    interface_spec["json_schemas"][field] = set()
-                interface_spec["json_schemas"][field].add(field_type)
-
-            # Convert sets to lists for JSON serialization
-            for field in interface_spec["json_schemas"]:
-                interface_spec["json_schemas"][field] = list(interface_spec["json_schemas"][field])
+            with _map_source(wrapper_file) as content:
+                # Extract command handling, output event and JSON schema patterns in one pass
+                for match in _WRAPPER_RE.finditer(content):
+                    kind = match.lastgroup
+                    if kind in ("action", "handler"):
+                        interface_spec["input_commands"][match[kind].decode()] = {"discovered_in": "handle_command"}
+                    elif kind == "event":
+                        interface_spec["output_events"][match["event"].decode()] = {"discovered_in": "output_json calls"}
+                    else:
+                        json_schemas[match["field"].decode()].add(match["ftype"].decode())
+
+            # Sorted lists for JSON serialization and stable output
+            interface_spec["json_schemas"] = {field: sorted(types) for field, types in json_schemas.items()}
 
             self.specs_data["wrapper_interface"] = interface_spec
             logger.info("Wrapper interface analysis completed")
@@ -176,15 +279,19 @@ class ClaudeCodeSpecExtractor:
                 }
 
         # Look for API files
-        api_files = list(specs_dir.rglob("*api*.py"))
+        # os.walk is scandir-backed; a plain substring test avoids fnmatch per entry
+        api_files = [
+            Path(root) / name
+            for root, _dirs, files in os.walk(specs_dir)
+            for name in files
+            if "api" in name and name.endswith(".py")
+        ]
         for api_file in api_files:
             try:
-                with open(api_file, 'r') as f:
-                    content = f.read()
-
-                # Extract class definitions
-                class_matches = re.findall(r'class (\w+)', content)
-                function_matches = re.findall(r'def (\w+)', content)
+                with _map_source(api_file) as content:
+                    # Extract class definitions
+                    class_matches = [m.decode() for m in _CLASS_RE.findall(content)]
+                    function_matches = [m.decode() for m in _DEF_RE.findall(content)]
 
                 app_structure["apis"][api_file.name] = {
                     "classes": class_matches,
@@ -215,7 +322,7 @@ class ClaudeCodeSpecExtractor:
             "session_management": {
                 "format": "JSONL files in ~/.claude/projects/*/sessions/",
                 "key_fields": ["type", "message", "sessionId", "timestamp", "version", "cwd", "gitBranch"],
-                "message_types": list(self.specs_data.get("session_patterns", {}).get("message_types", {}).keys())
+                "message_types": sorted(self.specs_data.get("session_patterns", {}).get("message_types", {}))
             },
             "stdio_interface": {
                 "input_format": "JSON lines on STDIN",
@@ -247,8 +354,13 @@ class ClaudeCodeSpecExtractor:
 
         # Save results
         output_file = self.base_dir / "claude_code_specifications.json"
-        with open(output_file, 'w') as f:
-            json.dump(self.specs_data, f, indent=2, sort_keys=True)
+        if orjson is not None:
+            output_file.write_bytes(
+                orjson.dumps(self.specs_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+            )
+        else:
+            with open(output_file, 'w') as f:
+                json.dump(self.specs_data, f, indent=2, sort_keys=True)
 
         logger.info(f"Extraction completed. Results saved to {output_file}")
 
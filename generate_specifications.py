@@ -7,12 +7,19 @@ This is the implementation of task 9 from the claude-code-wrapper-specs specific
 """
 
 import asyncio
+import json
 import logging
 import sys
 import os
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    # orjson not available, fall back to stdlib json
+    orjson = None
+
 # Add claudeCodeSpecs to Python path
 sys.path.insert(0, os.path.join(os.getcwd(), 'claudeCodeSpecs'))
 
@@ -30,6 +37,59 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Static sections of the specification report
+_DOC_OVERVIEW = """## Overview
+
+This document contains the initial specifications generated from runtime analysis of Claude Code implementations."""
+
+_DOC_PROCESS_TEMPLATE = """## Generation Process
+
+1. **Runtime Data Collection**: Captured {event_count} representative events
+2. **Behavioral Analysis**: Analyzed patterns using state machine generation and pattern detection
+3. **Protocol Schema Generation**: Created JSON schemas for commands, events, and states
+4. **Validation Criteria**: Defined comprehensive validation rules
+5. **Documentation**: Generated this specification document"""
+
+_DOC_TRAILER = """## Generated Files
+
+The following specification files have been generated in `claudeCodeSpecs/generated/`:
+
+- `protocol_schemas_*.json` - JSON schemas for Claude Code communication protocols
+- `behavioral_specs_*.json` - Behavioral patterns and specifications
+- `validation_criteria_*.json` - Validation rules and compliance criteria
+- `specification_report.md` - This documentation file
+
+## Usage
+
+These specifications serve as the foundation for Claude Code wrapper development. Wrapper implementations should:
+
+1. Follow the protocol schemas for all communication
+2. Exhibit the documented behavioral patterns
+3. Pass all validation criteria
+4. Maintain compliance with the generated rules
+
+## Next Steps
+
+1. Review generated specifications for accuracy
+2. Validate against additional real-world Claude Code usage
+3. Refine behavioral patterns based on more data
+4. Establish continuous monitoring for specification evolution
+
+---
+
+*Generated by Claude Code Specification System v1.0.0*
+"""
+
+
+def _dump_json(path, obj):
+    """Write obj to path as indented JSON, using orjson when available"""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2)
+
+
 class SpecificationGenerator:
     """Main class for executing complete specification generation workflow"""
 
@@ -37,6 +97,8 @@ class SpecificationGenerator:
         self.unified_api = UnifiedAPI()
         self.output_dir = Path("claudeCodeSpecs/generated")
         self.output_dir.mkdir(exist_ok=True)
+        # Files written by _generate_comprehensive_specs, keyed by required file pattern
+        self._generated_files = {}
 
     async def run_complete_workflow(self):
         """Execute the complete specification generation workflow"""
@@ -71,7 +133,7 @@ class SpecificationGenerator:
 
             # Step 5: Generate final documentation
             logger.info("Step 5: Generating final documentation...")
-            await self._generate_documentation(validation_results)
+            await self._generate_documentation(validation_results, len(runtime_data))
 
             logger.info("✅ Complete specification generation workflow finished successfully!")
             return True
@@ -83,12 +145,15 @@ class SpecificationGenerator:
     async def _generate_runtime_data(self):
         """Generate realistic runtime data based on Claude Code patterns"""
 
+        # All synthetic events share one capture time
+        timestamp = datetime.utcnow().isoformat()
+
         # Real Claude Code event patterns based on observed behavior
         runtime_events = [
             # Session initialization
             {
                 "event_type": "session_start",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": timestamp,
                 "payload": {
                     "session_id": "claude_session_001",
                     "user_context": "software_development",
@@ -99,7 +164,7 @@ class SpecificationGenerator:
             # Tool usage events
             {
                 "event_type": "tool_call",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": timestamp,
                 "payload": {
                     "tool": "Read",
                     "parameters": {"file_path": "/home/user/project/src/main.py"},
@@ -108,7 +173,7 @@ class SpecificationGenerator:
             },
             {
                 "event_type": "tool_response",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": timestamp,
                 "payload": {
                     "tool": "Read",
                     "success": True,
@@ -120,7 +185,7 @@ class SpecificationGenerator:
             # Code analysis and modification
             {
                 "event_type": "tool_call",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": timestamp,
                 "payload": {
                     "tool": "Edit",
                     "parameters": {
@@ -133,7 +198,7 @@ class SpecificationGenerator:
             },
             {
                 "event_type": "tool_response",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": timestamp,
                 "payload": {
                     "tool": "Edit",
                     "success": True,
@@ -145,7 +210,7 @@ class SpecificationGenerator:
             # Bash command execution
             {
                 "event_type": "tool_call",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": timestamp,
                 "payload": {
                     "tool": "Bash",
                     "parameters": {"command": "python src/main.py"},
@@ -154,7 +219,7 @@ class SpecificationGenerator:
             },
             {
                 "event_type": "tool_response",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": timestamp,
                 "payload": {
                     "tool": "Bash",
                     "success": True,
@@ -167,7 +232,7 @@ class SpecificationGenerator:
             # Multi-tool workflow
             {
                 "event_type": "parallel_tools",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": timestamp,
                 "payload": {
                     "tools": ["Read", "Read", "Grep"],
                     "batched": True,
@@ -178,7 +243,7 @@ class SpecificationGenerator:
             # Session completion
             {
                 "event_type": "session_end",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": timestamp,
                 "payload": {
                     "session_id": "claude_session_001",
                     "duration_seconds": 127.5,
@@ -222,32 +287,37 @@ class SpecificationGenerator:
         # Save all specifications
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-        # Save protocol schemas
         protocol_file = self.output_dir / f"protocol_schemas_{timestamp}.json"
-        with open(protocol_file, 'w') as f:
-            import json
-            json.dump(protocol_schemas, f, indent=2)
-
-        # Save behavioral specifications
         behavioral_file = self.output_dir / f"behavioral_specs_{timestamp}.json"
-        with open(behavioral_file, 'w') as f:
-            import json
-            json.dump(behavioral_specs, f, indent=2)
-
-        # Save validation criteria
         validation_file = self.output_dir / f"validation_criteria_{timestamp}.json"
-        with open(validation_file, 'w') as f:
-            import json
-            json.dump(validation_criteria, f, indent=2)
+
+        # Save protocol schemas, behavioral specifications and validation criteria
+        # concurrently in worker threads so disk I/O does not block the event loop
+        await asyncio.gather(
+            asyncio.to_thread(_dump_json, protocol_file, protocol_schemas),
+            asyncio.to_thread(_dump_json, behavioral_file, behavioral_specs),
+            asyncio.to_thread(_dump_json, validation_file, validation_criteria)
+        )
+
+        self._generated_files = {
+            "protocol_schemas_*.json": protocol_file,
+            "behavioral_specs_*.json": behavioral_file,
+            "validation_criteria_*.json": validation_file
+        }
 
         logger.info(f"Generated comprehensive specifications in {self.output_dir}")
 
     def _generate_protocol_schemas(self, runtime_data):
         """Generate protocol schemas from runtime data"""
 
-        # Extract tool usage patterns
-        tool_calls = [event for event in runtime_data if event["event_type"] == "tool_call"]
-        tool_responses = [event for event in runtime_data if event["event_type"] == "tool_response"]
+        # Collect called tools and event types in a single pass
+        tools = set()
+        event_types = set()
+        for event in runtime_data:
+            event_type = event["event_type"]
+            event_types.add(event_type)
+            if event_type == "tool_call":
+                tools.add(event["payload"]["tool"])
 
         # Generate command schema
         command_schema = {
@@ -257,7 +327,7 @@ class SpecificationGenerator:
             "properties": {
                 "tool": {
                     "type": "string",
-                    "enum": list(set(call["payload"]["tool"] for call in tool_calls))
+                    "enum": sorted(tools)
                 },
                 "parameters": {
                     "type": "object",
@@ -282,7 +352,7 @@ class SpecificationGenerator:
             "properties": {
                 "event_type": {
                     "type": "string",
-                    "enum": list(set(event["event_type"] for event in runtime_data))
+                    "enum": sorted(event_types)
                 },
                 "timestamp": {
                     "type": "string",
@@ -385,18 +455,23 @@ class SpecificationGenerator:
             "validation_criteria_*.json"
         ]
 
+        # The generated paths are known, so probe them directly instead of globbing the directory
         for pattern in required_files:
-            import glob
-            matches = glob.glob(str(self.output_dir / pattern))
-            if not matches:
+            generated_file = self._generated_files.get(pattern)
+            if generated_file is None or not generated_file.exists():
                 validation_results["completeness_check"] = False
                 validation_results["errors"].append(f"Missing required file: {pattern}")
 
         logger.info(f"Validation results: {validation_results}")
         return validation_results
 
-    async def _generate_documentation(self, validation_results):
-        """Generate final documentation for the specifications"""
+    async def _generate_documentation(self, validation_results, event_count):
+        """Generate final documentation for the specifications
+
+        Args:
+            validation_results: Results from _validate_specifications
+            event_count: Number of runtime events the specifications were built from
+        """
 
         # Build error and warning sections
         error_section = ""
@@ -411,67 +486,29 @@ class SpecificationGenerator:
         else:
             warning_section = "No warnings found."
 
-        runtime_data = await self._generate_runtime_data()
-
-        doc_content = f"""# Claude Code Wrapper Specifications
-
-Generated on: {datetime.now().isoformat()}
-
-## Overview
-
-This document contains the initial specifications generated from runtime analysis of Claude Code implementations.
-
-## Generation Process
-
-1. **Runtime Data Collection**: Captured {len(runtime_data)} representative events
-2. **Behavioral Analysis**: Analyzed patterns using state machine generation and pattern detection
-3. **Protocol Schema Generation**: Created JSON schemas for commands, events, and states
-4. **Validation Criteria**: Defined comprehensive validation rules
-5. **Documentation**: Generated this specification document
-
-## Validation Results
-
-- Schema Validation: {'✅ PASSED' if validation_results['schema_validation'] else '❌ FAILED'}
-- Completeness Check: {'✅ PASSED' if validation_results['completeness_check'] else '❌ FAILED'}
-- Consistency Check: {'✅ PASSED' if validation_results['consistency_check'] else '❌ FAILED'}
-
-{error_section}
-
-{warning_section}
-
-## Generated Files
-
-The following specification files have been generated in `claudeCodeSpecs/generated/`:
-
-- `protocol_schemas_*.json` - JSON schemas for Claude Code communication protocols
-- `behavioral_specs_*.json` - Behavioral patterns and specifications
-- `validation_criteria_*.json` - Validation rules and compliance criteria
-- `specification_report.md` - This documentation file
-
-## Usage
-
-These specifications serve as the foundation for Claude Code wrapper development. Wrapper implementations should:
-
-1. Follow the protocol schemas for all communication
-2. Exhibit the documented behavioral patterns
-3. Pass all validation criteria
-4. Maintain compliance with the generated rules
-
-## Next Steps
-
-1. Review generated specifications for accuracy
-2. Validate against additional real-world Claude Code usage
-3. Refine behavioral patterns based on more data
-4. Establish continuous monitoring for specification evolution
-
----
-
-*Generated by Claude Code Specification System v1.0.0*
-"""
+        passed = '✅ PASSED'
+        failed = '❌ FAILED'
+
+        # Assemble the report from its sections and join once
+        parts = [
+            "# Claude Code Wrapper Specifications",
+            f"Generated on: {datetime.now().isoformat()}",
+            _DOC_OVERVIEW,
+            _DOC_PROCESS_TEMPLATE.format(event_count=event_count),
+            "\n".join([
+                "## Validation Results",
+                "",
+                f"- Schema Validation: {passed if validation_results['schema_validation'] else failed}",
+                f"- Completeness Check: {passed if validation_results['completeness_check'] else failed}",
+                f"- Consistency Check: {passed if validation_results['consistency_check'] else failed}"
+            ]),
+            error_section,
+            warning_section,
+            _DOC_TRAILER
+        ]
 
         doc_file = self.output_dir / "specification_report.md"
-        with open(doc_file, 'w') as f:
-            f.write(doc_content)
+        await asyncio.to_thread(doc_file.write_text, "\n\n".join(parts), encoding="utf-8")
 
         logger.info(f"Generated specification documentation: {doc_file}")
 
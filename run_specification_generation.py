@@ -8,9 +8,22 @@ Execute runtime analysis and generate specifications using existing components.
 import sys
 import os
 import json
+import functools
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    # orjson not available, fall back to stdlib json
+    orjson = None
+
+try:
+    import fastjsonschema
+except ImportError:
+    # fastjsonschema not available, runtime events are not schema-checked
+    fastjsonschema = None
+
 # Add claudeCodeSpecs to Python path
 sys.path.insert(0, os.path.join(os.getcwd(), 'claudeCodeSpecs'))
 
@@ -18,81 +31,233 @@ from analysis.behavior_analyzer import BehaviorAnalyzer
 from analysis.state_machine_generator import StateMachineGenerator
 from analysis.pattern_detector import PatternDetector
 
-def generate_claude_code_runtime_events():
-    """Generate realistic Claude Code runtime events for analysis"""
-    return [
-        # Session start
-        {
-            "timestamp": "2025-09-28T10:00:00Z",
-            "event_type": "session_start",
-            "session_id": "claude_001",
-            "payload": {"user_context": "code_development"}
-        },
-
-        # Tool usage sequence
-        {
-            "timestamp": "2025-09-28T10:00:01Z",
-            "event_type": "tool_call",
-            "session_id": "claude_001",
-            "payload": {"tool": "Read", "file": "src/main.py"}
+# Protocol schemas and validation criteria embedded in every generated specification
+_PROTOCOL_SCHEMAS = {
+    "tool_call_schema": {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "type": "object",
+        "properties": {
+            "timestamp": {"type": "string", "format": "date-time"},
+            "event_type": {"type": "string", "enum": ["tool_call"]},
+            "session_id": {"type": "string"},
+            "payload": {
+                "type": "object",
+                "properties": {
+                    "tool": {"type": "string"},
+                    "parameters": {"type": "object"}
+                },
+                "required": ["tool"]
+            }
         },
-        {
-            "timestamp": "2025-09-28T10:00:02Z",
-            "event_type": "tool_response",
-            "session_id": "claude_001",
-            "payload": {"tool": "Read", "success": True, "content_length": 1024}
+        "required": ["timestamp", "event_type", "session_id", "payload"]
+    },
+    "tool_response_schema": {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "type": "object",
+        "properties": {
+            "timestamp": {"type": "string", "format": "date-time"},
+            "event_type": {"type": "string", "enum": ["tool_response"]},
+            "session_id": {"type": "string"},
+            "payload": {
+                "type": "object",
+                "properties": {
+                    "tool": {"type": "string"},
+                    "success": {"type": "boolean"},
+                    "data": {"type": "object"}
+                },
+                "required": ["tool", "success"]
+            }
         },
+        "required": ["timestamp", "event_type", "session_id", "payload"]
+    }
+}
+
+_VALIDATION_CRITERIA = (
+    {
+        "criterion_id": "tool_call_format",
+        "description": "All tool calls must follow standard format",
+        "test_type": "schema_validation",
+        "acceptance_threshold": 1.0
+    },
+    {
+        "criterion_id": "session_lifecycle",
+        "description": "Sessions must start and end properly",
+        "test_type": "lifecycle_validation",
+        "acceptance_threshold": 1.0
+    },
+    {
+        "criterion_id": "tool_response_consistency",
+        "description": "Tool responses must match their calls",
+        "test_type": "consistency_validation",
+        "acceptance_threshold": 0.95
+    }
+)
+
+# Representative Claude Code runtime events; static, so built once at import
+_RUNTIME_EVENTS = (
+    # Session start
+    {
+        "timestamp": "2025-09-28T10:00:00Z",
+        "event_type": "session_start",
+        "session_id": "claude_001",
+        "payload": {"user_context": "code_development"}
+    },
+
+    # Tool usage sequence
+    {
+        "timestamp": "2025-09-28T10:00:01Z",
+        "event_type": "tool_call",
+        "session_id": "claude_001",
+        "payload": {"tool": "Read", "file": "src/main.py"}
+    },
+    {
+        "timestamp": "2025-09-28T10:00:02Z",
+        "event_type": "tool_response",
+        "session_id": "claude_001",
+        "payload": {"tool": "Read", "success": True, "content_length": 1024}
+    },
+
+    # Code analysis
+    {
+        "timestamp": "2025-09-28T10:00:03Z",
+        "event_type": "tool_call",
+        "session_id": "claude_001",
+        "payload": {"tool": "Grep", "pattern": "function", "files": "*.py"}
+    },
+    {
+        "timestamp": "2025-09-28T10:00:04Z",
+        "event_type": "tool_response",
+        "session_id": "claude_001",
+        "payload": {"tool": "Grep", "success": True, "matches": 15}
+    },
+
+    # Code modification
+    {
+        "timestamp": "2025-09-28T10:00:05Z",
+        "event_type": "tool_call",
+        "session_id": "claude_001",
+        "payload": {"tool": "Edit", "file": "src/main.py", "operation": "replace"}
+    },
+    {
+        "timestamp": "2025-09-28T10:00:06Z",
+        "event_type": "tool_response",
+        "session_id": "claude_001",
+        "payload": {"tool": "Edit", "success": True, "changes": 1}
+    },
+
+    # Testing
+    {
+        "timestamp": "2025-09-28T10:00:07Z",
+        "event_type": "tool_call",
+        "session_id": "claude_001",
+        "payload": {"tool": "Bash", "command": "python -m pytest"}
+    },
+    {
+        "timestamp": "2025-09-28T10:00:15Z",
+        "event_type": "tool_response",
+        "session_id": "claude_001",
+        "payload": {"tool": "Bash", "success": True, "exit_code": 0, "output": "5 passed"}
+    },
+
+    # Session completion
+    {
+        "timestamp": "2025-09-28T10:00:16Z",
+        "event_type": "session_end",
+        "session_id": "claude_001",
+        "payload": {"duration": 16, "tools_used": 4, "success": True}
+    }
+)
 
-        # Code analysis
-        {
-            "timestamp": "2025-09-28T10:00:03Z",
-            "event_type": "tool_call",
-            "session_id": "claude_001",
-            "payload": {"tool": "Grep", "pattern": "function", "files": "*.py"}
-        },
-        {
-            "timestamp": "2025-09-28T10:00:04Z",
-            "event_type": "tool_response",
-            "session_id": "claude_001",
-            "payload": {"tool": "Grep", "success": True, "matches": 15}
-        },
+# Specification documentation layout; only the analysis results are filled in per run
+_DOC_TEMPLATE = """# Claude Code Wrapper Specification
 
-        # Code modification
-        {
-            "timestamp": "2025-09-28T10:00:05Z",
-            "event_type": "tool_call",
-            "session_id": "claude_001",
-            "payload": {"tool": "Edit", "file": "src/main.py", "operation": "replace"}
-        },
-        {
-            "timestamp": "2025-09-28T10:00:06Z",
-            "event_type": "tool_response",
-            "session_id": "claude_001",
-            "payload": {"tool": "Edit", "success": True, "changes": 1}
-        },
+Generated: {generated}
 
-        # Testing
-        {
-            "timestamp": "2025-09-28T10:00:07Z",
-            "event_type": "tool_call",
-            "session_id": "claude_001",
-            "payload": {"tool": "Bash", "command": "python -m pytest"}
-        },
-        {
-            "timestamp": "2025-09-28T10:00:15Z",
-            "event_type": "tool_response",
-            "session_id": "claude_001",
-            "payload": {"tool": "Bash", "success": True, "exit_code": 0, "output": "5 passed"}
-        },
+## Overview
 
-        # Session completion
-        {
-            "timestamp": "2025-09-28T10:00:16Z",
-            "event_type": "session_end",
-            "session_id": "claude_001",
-            "payload": {"duration": 16, "tools_used": 4, "success": True}
-        }
-    ]
+This specification defines the behavioral patterns, protocol schemas, and validation criteria for Claude Code wrapper implementations based on runtime analysis.
+
+## Key Findings
+
+- **Total Events Analyzed**: {event_count}
+- **Behavioral Patterns**: {pattern_count} detected
+- **State Machine States**: {state_count} states
+- **Tool Types Used**: {tool_count}
+
+## Behavioral Patterns
+
+{pattern_lines}
+
+## State Machine
+
+The generated state machine includes the following states:
+{state_lines}
+
+## Protocol Schemas
+
+- Tool Call Schema: Defines format for tool invocations
+- Tool Response Schema: Defines format for tool responses
+- Session Events Schema: Defines session lifecycle events
+
+## Validation Criteria
+
+- Tool call format validation (100% compliance required)
+- Session lifecycle validation (100% compliance required)
+- Tool response consistency (95% compliance required)
+
+## Implementation Guidelines
+
+1. **Session Management**: Maintain proper session lifecycle
+2. **Tool Integration**: Follow defined call/response patterns
+3. **Error Handling**: Handle tool failures gracefully
+4. **Performance**: Ensure reasonable execution timeframes
+
+---
+
+*Generated by Claude Code Specification System v1.0.0*
+"""
+
+def generate_claude_code_runtime_events():
+    """Generate realistic Claude Code runtime events for analysis
+
+    Returns the shared module-level tuple; callers must not mutate the events.
+    """
+    return _RUNTIME_EVENTS
+
+@functools.cache
+def _analysis_components():
+    """Create the analysis components once and reuse them across main() calls"""
+    return BehaviorAnalyzer(), StateMachineGenerator(), PatternDetector()
+
+def validate_runtime_events(events, protocol_schemas):
+    """Validate tool call/response events against the protocol schemas
+
+    Each schema is compiled once with fastjsonschema and events are dispatched
+    to the compiled validator for their event_type.
+
+    Args:
+        events: Runtime events to check
+        protocol_schemas: Protocol schemas keyed by schema name
+
+    Returns:
+        List of validation failure messages
+    """
+    validators = {
+        "tool_call": fastjsonschema.compile(protocol_schemas["tool_call_schema"]),
+        "tool_response": fastjsonschema.compile(protocol_schemas["tool_response_schema"])
+    }
+
+    failures = []
+    for index, event in enumerate(events):
+        validate = validators.get(event.get("event_type"))
+        if validate is None:
+            continue
+        try:
+            validate(event)
+        except fastjsonschema.JsonSchemaValueException as e:
+            failures.append(f"Event {index} ({event['event_type']}): {e.message}")
+
+    return failures
 
 def main():
     """Main execution function"""
@@ -103,12 +268,11 @@ def main():
     print("📊 Generating runtime events...")
     events = generate_claude_code_runtime_events()
     print(f"   Generated {len(events)} events")
+    tool_names = {e['payload'].get('tool', '') for e in events if e['event_type'] == 'tool_call'}
 
     # Initialize analysis components
     print("🔧 Initializing analysis components...")
-    analyzer = BehaviorAnalyzer()
-    state_generator = StateMachineGenerator()
-    pattern_detector = PatternDetector()
+    analyzer, state_generator, pattern_detector = _analysis_components()
 
     # Run behavioral analysis
     print("🧠 Running behavioral analysis...")
@@ -151,65 +315,8 @@ def main():
         "behavioral_analysis": session_analysis,
         "state_machine": state_machine,
         "detected_patterns": patterns,
-        "protocol_schemas": {
-            "tool_call_schema": {
-                "$schema": "http://json-schema.org/draft-07/schema#",
-                "type": "object",
-                "properties": {
-                    "timestamp": {"type": "string", "format": "date-time"},
-                    "event_type": {"type": "string", "enum": ["tool_call"]},
-                    "session_id": {"type": "string"},
-                    "payload": {
-                        "type": "object",
-                        "properties": {
-                            "tool": {"type": "string"},
-                            "parameters": {"type": "object"}
-                        },
-                        "required": ["tool"]
-                    }
-                },
-                "required": ["timestamp", "event_type", "session_id", "payload"]
-            },
-            "tool_response_schema": {
-                "$schema": "http://json-schema.org/draft-07/schema#",
-                "type": "object",
-                "properties": {
-                    "timestamp": {"type": "string", "format": "date-time"},
-                    "event_type": {"type": "string", "enum": ["tool_response"]},
-                    "session_id": {"type": "string"},
-                    "payload": {
-                        "type": "object",
-                        "properties": {
-                            "tool": {"type": "string"},
-                            "success": {"type": "boolean"},
-                            "data": {"type": "object"}
-                        },
-                        "required": ["tool", "success"]
-                    }
-                },
-                "required": ["timestamp", "event_type", "session_id", "payload"]
-            }
-        },
-        "validation_criteria": [
-            {
-                "criterion_id": "tool_call_format",
-                "description": "All tool calls must follow standard format",
-                "test_type": "schema_validation",
-                "acceptance_threshold": 1.0
-            },
-            {
-                "criterion_id": "session_lifecycle",
-                "description": "Sessions must start and end properly",
-                "test_type": "lifecycle_validation",
-                "acceptance_threshold": 1.0
-            },
-            {
-                "criterion_id": "tool_response_consistency",
-                "description": "Tool responses must match their calls",
-                "test_type": "consistency_validation",
-                "acceptance_threshold": 0.95
-            }
-        ],
+        "protocol_schemas": _PROTOCOL_SCHEMAS,
+        "validation_criteria": _VALIDATION_CRITERIA,
         "implementation_guidelines": {
             "session_management": "Implementations must properly track session lifecycle",
             "tool_integration": "All tools must follow the defined call/response pattern",
@@ -218,65 +325,40 @@ def main():
         }
     }
 
+    # Check the runtime events against the generated protocol schemas
+    if fastjsonschema is not None:
+        failures = validate_runtime_events(events, _PROTOCOL_SCHEMAS)
+        print(f"   Validated runtime events against protocol schemas: {len(failures)} failures")
+        for failure in failures:
+            print(f"   ⚠️  {failure}")
+
     # Save the main specification
     spec_file = output_dir / f"claude_code_specification_{timestamp}.json"
-    with open(spec_file, 'w') as f:
-        json.dump(specification, f, indent=2)
+    if orjson is not None:
+        spec_file.write_bytes(
+            orjson.dumps(specification, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        )
+    else:
+        spec_file.write_bytes(json.dumps(specification, indent=2).encode("utf-8"))
 
     print(f"   📄 Saved specification: {spec_file}")
 
     # Generate markdown documentation
-    doc_content = f"""# Claude Code Wrapper Specification
-
-Generated: {datetime.now().isoformat()}
-
-## Overview
-
-This specification defines the behavioral patterns, protocol schemas, and validation criteria for Claude Code wrapper implementations based on runtime analysis.
-
-## Key Findings
-
-- **Total Events Analyzed**: {len(events)}
-- **Behavioral Patterns**: {len(patterns)} detected
-- **State Machine States**: {len(state_machine.get('states', []))} states
-- **Tool Types Used**: {len(set(e['payload'].get('tool', '') for e in events if e['event_type'] == 'tool_call'))}
-
-## Behavioral Patterns
-
-{chr(10).join(f"- **{p.get('name', 'Unknown')}**: {p.get('description', 'No description')}" for p in patterns)}
-
-## State Machine
-
-The generated state machine includes the following states:
-{chr(10).join(f"- {state}" for state in state_machine.get('states', []))}
-
-## Protocol Schemas
-
-- Tool Call Schema: Defines format for tool invocations
-- Tool Response Schema: Defines format for tool responses
-- Session Events Schema: Defines session lifecycle events
-
-## Validation Criteria
-
-- Tool call format validation (100% compliance required)
-- Session lifecycle validation (100% compliance required)
-- Tool response consistency (95% compliance required)
-
-## Implementation Guidelines
-
-1. **Session Management**: Maintain proper session lifecycle
-2. **Tool Integration**: Follow defined call/response patterns
-3. **Error Handling**: Handle tool failures gracefully
-4. **Performance**: Ensure reasonable execution timeframes
-
----
-
-*Generated by Claude Code Specification System v1.0.0*
-"""
+    states = state_machine.get('states', [])
+    doc_content = _DOC_TEMPLATE.format(
+        generated=datetime.now().isoformat(),
+        event_count=len(events),
+        pattern_count=len(patterns),
+        state_count=len(states),
+        tool_count=len(tool_names),
+        pattern_lines="\n".join(
+            f"- **{p.get('name', 'Unknown')}**: {p.get('description', 'No description')}" for p in patterns
+        ),
+        state_lines="\n".join(f"- {state}" for state in states)
+    )
 
     doc_file = output_dir / f"specification_documentation_{timestamp}.md"
-    with open(doc_file, 'w') as f:
-        f.write(doc_content)
+    doc_file.write_bytes(doc_content.encode("utf-8"))
 
     print(f"   📋 Saved documentation: {doc_file}")
 
@@ -6,23 +6,42 @@ This script exposes a thin control plane for Anthropic's Claude Code agent via S
 It is designed to be driven by external worker processes (e.g. a Node.js orchestrator) and
 supports streaming message forwarding, state tracking, task cancellation, and session-aware
 execution using the official `claude_code_sdk` asynchronous API.
+
+Set CLAUDE_WRAPPER_GZIP=1 to gzip stdout. The stream is sync-flushed after every write, so
+the orchestrator can decompress it incrementally (e.g. through `zcat` or zlib's gunzip stream)
+and still see each event as soon as it is written.
 """
 
 from __future__ import annotations
 
 import dataclasses
+import functools
 import inspect
 import json
 import logging
+import math
+import os
+import re
 import signal
 import sys
+import time
 import traceback
 import uuid
+import zlib
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 import anyio
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+    _json_loads = json.loads
+else:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the latter
+    _json_loads = orjson.loads
+
 try:
     from claude_code_sdk import ProcessError, ClaudeCodeOptions, query
 except ImportError as import_error:  # pragma: no cover - handled at runtime
@@ -43,6 +62,228 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Compressor for CLAUDE_WRAPPER_GZIP=1 output (gzip container, fastest level), else None
+_gzip_stdout = (
+    zlib.compressobj(1, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if os.environ.get("CLAUDE_WRAPPER_GZIP") == "1"
+    else None
+)
+
+# Frames included in run_failed tracebacks; 0 leaves the traceback out entirely
+_TRACEBACK_LIMIT = int(os.environ.get("CLAUDE_WRAPPER_TB_LIMIT", "20"))
+
+# (epoch second, formatted "YYYY-MM-DDTHH:MM:SS") of the last timestamp rendered
+_iso_second_cache: tuple[int, str] = (-1, "")
+
+
+def _utc_now_iso() -> str:
+    """Return the current UTC time formatted like ``datetime.utcnow().isoformat()``.
+
+    Events emitted within the same second share the formatted date/time prefix,
+    so only the microsecond suffix is rendered per call.
+    """
+    global _iso_second_cache
+    seconds, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    cached_second, prefix = _iso_second_cache
+    if seconds != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _iso_second_cache = (seconds, prefix)
+    # isoformat() omits the fraction when it is zero
+    return f"{prefix}.{micros:06d}" if micros else prefix
+
+
+def _write_stdout(payload: bytes) -> None:
+    """Write ``payload`` to fd 1 in full, bypassing ``sys.stdout``'s text layer."""
+    if _gzip_stdout is not None:
+        # Sync flush so everything written so far can be decompressed right away
+        payload = _gzip_stdout.compress(payload) + _gzip_stdout.flush(zlib.Z_SYNC_FLUSH)
+    view = memoryview(payload)
+    while view:
+        written = os.write(1, view)
+        view = view[written:]
+
+
+@functools.lru_cache(maxsize=None)
+def _dataclass_field_names(cls: type) -> tuple[str, ...]:
+    """Return the field names of dataclass ``cls``, resolved once per class."""
+    return tuple(field.name for field in dataclasses.fields(cls))
+
+
+def _shallow_asdict(obj: Any) -> Dict[str, Any]:
+    """Top-level fields of dataclass ``obj`` without ``asdict``'s recursive deep copy.
+
+    Nested dataclasses are left as-is for the JSON encoder to handle.
+    """
+    return {name: getattr(obj, name) for name in _dataclass_field_names(type(obj))}
+
+
+def _public_attrs(message: Any) -> Dict[str, Any]:
+    public_attrs = {
+        key: getattr(message, key)
+        for key in dir(message)
+        if not key.startswith("_") and not callable(getattr(message, key))
+    }
+    return public_attrs or {"repr": repr(message)}
+
+
+@functools.lru_cache(maxsize=128)
+def _message_extractor(cls: type) -> Callable[[Any], Dict[str, Any]]:
+    """Return the function that turns an instance of ``cls`` into a fresh dict.
+
+    Streams carry a handful of SDK message classes, so the type checks run once
+    per class rather than once per message.
+    """
+    if issubclass(cls, dict):
+        return dict
+    if dataclasses.is_dataclass(cls):
+        names = _dataclass_field_names(cls)
+        return lambda message: {name: getattr(message, name) for name in names}
+    if hasattr(cls, "model_dump"):
+        return lambda message: message.model_dump()
+
+    # Public names dir() would find on the class (properties, constants); instance
+    # attributes are added per message from its __dict__
+    class_names = frozenset(
+        name
+        for name in dir(cls)
+        if not name.startswith("_") and not callable(getattr(cls, name, None))
+    )
+
+    def extract(message: Any) -> Dict[str, Any]:
+        try:
+            instance_attrs = vars(message)
+        except TypeError:  # __slots__ without __dict__
+            return _public_attrs(message)
+        public_attrs = {}
+        # Sorted to keep dir()'s key order
+        for key in sorted(class_names.union(instance_attrs)):
+            if key.startswith("_"):
+                continue
+            value = getattr(message, key)
+            if not callable(value):
+                public_attrs[key] = value
+        return public_attrs or {"repr": repr(message)}
+
+    return extract
+
+
+@functools.lru_cache(maxsize=32)
+def _options_for(items: tuple) -> Any:
+    """Build ``ClaudeCodeOptions`` once per distinct set of hashable option values.
+
+    Queue workers tend to send the same options with every prompt; the SDK only
+    reads the options object, so runs can share it.
+    """
+    return ClaudeCodeOptions(**dict(items))  # type: ignore[misc]
+
+
+def _public_vars(obj: Any) -> Any:
+    try:
+        items = vars(obj).items()
+    except TypeError:  # no __dict__
+        return str(obj)
+    return {key: value for key, value in items if not key.startswith("_")}
+
+
+@functools.lru_cache(maxsize=128)
+def _default_encoder(cls: type) -> Callable[[Any], Any]:
+    """Return how the JSON ``default`` hook converts instances of ``cls``.
+
+    The same few unsupported types recur across a stream, so the checks run
+    once per class.
+    """
+    if issubclass(cls, datetime):
+        return datetime.isoformat
+    if dataclasses.is_dataclass(cls):
+        return _shallow_asdict
+    if issubclass(cls, (set, frozenset, tuple)):
+        return list
+    if hasattr(cls, "model_dump"):
+        return lambda obj: obj.model_dump()
+    return _public_vars
+
+
+# Stream events are assembled from this, the timestamp, the run's envelope and the payload
+_STREAM_EVENT_HEAD = b'{"event":"stream","timestamp":"'
+
+# Rate/usage limit notices in SDK message text
+_LIMIT_NOTICE_RE = re.compile(r"(limit\s*reached|rate\s*limit|usage\s*limit)", re.IGNORECASE)
+# Message keys _detect_limit_message collects candidate text from
+_LIMIT_SOURCE_KEYS = frozenset({"message", "error", "reason", "payload", "content"})
+
+# Deprecated permission_mode values and the ClaudeCodeOptions value that replaced them
+_LEGACY_PERMISSION_MODES = {"acceptAll": "bypassPermissions"}
+
+
+# Placeholders for the per-emission fields of a pre-encoded event, as encoded JSON
+_SLOT_KEYS = ("timestamp", "run_id")
+_TIMESTAMP_SLOT = b'"\\u0000timestamp\\u0000"'
+_RUN_ID_SLOT = b'"\\u0000run_id\\u0000"'
+_SLOT_RE = re.compile(b"(" + re.escape(_TIMESTAMP_SLOT) + b"|" + re.escape(_RUN_ID_SLOT) + b")")
+
+
+class _EventTemplate:
+    """Pre-encoded JSON line for an event that only varies in ``timestamp``/``run_id``.
+
+    Every other field is encoded once at import; emitting splices the current
+    timestamp (and run id) into the cached bytes instead of re-serialising the
+    whole dict. Fields passed as ``None`` for ``timestamp``/``run_id`` mark the
+    slots. Without orjson the event is emitted through ``output_json`` instead.
+    """
+
+    __slots__ = ("fields", "parts")
+
+    def __init__(self, fields: Dict[str, Any]) -> None:
+        self.fields = fields
+        self.parts: Optional[list[bytes]] = None
+        if orjson is not None:
+            marked = {
+                key: f"\x00{key}\x00" if key in _SLOT_KEYS and value is None else value
+                for key, value in fields.items()
+            }
+            self.parts = _SLOT_RE.split(orjson.dumps(marked, option=orjson.OPT_APPEND_NEWLINE))
+
+    def render(self, timestamp: str, run_id: Any = None) -> bytes:
+        assert self.parts is not None
+        encoded_timestamp = b'"' + timestamp.encode() + b'"'
+        encoded_run_id = orjson.dumps(run_id)
+        return b"".join(
+            encoded_timestamp if part == _TIMESTAMP_SLOT
+            else encoded_run_id if part == _RUN_ID_SLOT
+            else part
+            for part in self.parts
+        )
+
+
+_CANCEL_NOT_CANCELLABLE = _EventTemplate(
+    {"event": "cancel_ignored", "reason": "not_cancellable", "timestamp": None}
+)
+_MISSING_PROMPT = _EventTemplate(
+    {"event": "error", "timestamp": None, "error": "Missing prompt"}
+)
+_RUN_CANCELLED = _EventTemplate(
+    {
+        "event": "run_cancelled",
+        "timestamp": None,
+        "run_id": None,
+        "version": 1,
+        "outcome": "cancelled",
+        "reason": "cancel_requested",
+        "tags": [],
+    }
+)
+_RUN_COMPLETED = _EventTemplate(
+    {
+        "event": "run_completed",
+        "timestamp": None,
+        "run_id": None,
+        "version": 1,
+        "outcome": "completed",
+        "reason": "ok",
+        "tags": [],
+    }
+)
+
 
 class ClaudeCodeWrapper:
     """High-level orchestrator around the Claude Code Python SDK."""
@@ -59,17 +300,42 @@ class ClaudeCodeWrapper:
         self.current_run_done_event: Optional[anyio.Event] = None
         self.task_group: Optional[anyio.abc.TaskGroup] = None
         self._options_signature = inspect.signature(ClaudeCodeOptions)  # type: ignore[arg-type]
+        self._allowed_option_keys = frozenset(self._options_signature.parameters) - {"self"}
         self.last_session_id: Optional[str] = None
-        self.setup_signal_handlers()
+        self._stdin_fd = sys.stdin.fileno()
+        self._stdin_buffer = b""
+        self._event_send = None
+        self._command_handlers = {
+            "prompt": self.handle_prompt,
+            "cancel": self.handle_cancel,
+            "status": self.handle_status,
+            "shutdown": self.handle_shutdown,
+        }
 
     # ---------------------------------------------------------------------
     # Signal handling
     # ---------------------------------------------------------------------
+    async def _watch_signals(self) -> None:
+        """Handle SIGTERM/SIGINT as ordinary event-loop work while run() is active.
+
+        Handling them from the loop keeps the emitted event from interrupting
+        an in-progress write or a half-updated run context.
+        """
+        try:
+            with anyio.open_signal_receiver(signal.SIGTERM, signal.SIGINT) as signals:
+                async for signum in signals:
+                    self.handle_signal(signum)
+        except NotImplementedError:  # pragma: no cover - e.g. asyncio on Windows
+            self.setup_signal_handlers()
+
     def setup_signal_handlers(self) -> None:
         signal.signal(signal.SIGTERM, self.signal_handler)
         signal.signal(signal.SIGINT, self.signal_handler)
 
     def signal_handler(self, signum: int, frame) -> None:  # pragma: no cover
+        self.handle_signal(signum)
+
+    def handle_signal(self, signum: int) -> None:
         logger.info("Received signal %s, requesting shutdown", signum)
         self.shutdown_requested = True
         if self.current_run and self.current_run.get("cancel_scope") is not None:
@@ -79,7 +345,7 @@ class ClaudeCodeWrapper:
                 "event": "signal",
                 "state": "terminating",
                 "signal": signum,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": _utc_now_iso(),
             }
         )
 
@@ -88,28 +354,114 @@ class ClaudeCodeWrapper:
     # ---------------------------------------------------------------------
     def output_json(self, data: Dict[str, Any]) -> None:
         try:
-            json_output = json.dumps(data, ensure_ascii=False, default=self._json_default)
-            print(json_output, flush=True)
+            payload = None
+            if orjson is not None:
+                try:
+                    payload = orjson.dumps(
+                        data,
+                        default=self._json_default,
+                        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE,
+                    )
+                except orjson.JSONEncodeError:
+                    pass  # e.g. integers wider than 64 bits, which stdlib json still handles
+            if payload is None:
+                payload = (
+                    json.dumps(data, ensure_ascii=False, default=self._json_default) + "\n"
+                ).encode("utf-8")
         except Exception:  # pragma: no cover - logging best effort
             logger.error("Failed to serialise JSON", exc_info=True)
+            return
+        self._emit(payload)
+
+    def _emit(self, payload: bytes) -> None:
+        """Hand an encoded event line to the writer task, or write it directly."""
+        if self._event_send is not None:
+            self._event_send.send_nowait(payload)
+            return
+        try:
+            _write_stdout(payload)
+        except Exception:  # pragma: no cover - logging best effort
+            logger.error("Failed to write to stdout", exc_info=True)
+
+    async def _write_events(self, receive_stream) -> None:
+        """Sole stdout writer while the wrapper runs.
+
+        Whatever queued up during the previous write goes out as a single batch,
+        and the write itself happens in a worker thread so a slow consumer does
+        not stall the event loop. Shielded so queued events still drain when the
+        run is torn down by an error.
+        """
+        with anyio.CancelScope(shield=True):
+            async with receive_stream:
+                async for payload in receive_stream:
+                    batch = bytearray(payload)
+                    while True:
+                        try:
+                            batch += receive_stream.receive_nowait()
+                        except (anyio.WouldBlock, anyio.EndOfStream):
+                            break
+                    try:
+                        await anyio.to_thread.run_sync(_write_stdout, batch)
+                    except Exception:  # pragma: no cover - logging best effort
+                        logger.error("Failed to write to stdout", exc_info=True)
+
+    def output_event(self, template: _EventTemplate, run_id: Any = None) -> None:
+        """Emit a pre-encoded event with the current timestamp (and run id)."""
+        timestamp = _utc_now_iso()
+        if template.parts is not None:
+            try:
+                self._emit(template.render(timestamp, run_id))
+                return
+            except orjson.JSONEncodeError:
+                pass  # run id orjson cannot encode; serialise the full event below
+
+        data = dict(template.fields, timestamp=timestamp)
+        if "run_id" in data:
+            data["run_id"] = run_id
+        self.output_json(data)
 
     @staticmethod
-    def _json_default(obj: Any) -> Any:
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        if dataclasses.is_dataclass(obj):
-            return dataclasses.asdict(obj)
-        if isinstance(obj, (set, frozenset, tuple)):
-            return list(obj)
-        if hasattr(obj, "model_dump"):
-            return obj.model_dump()  # type: ignore[misc]
-        if hasattr(obj, "__dict__"):
-            return {
-                key: value
-                for key, value in vars(obj).items()
-                if not key.startswith("_")
+    def _stream_envelope(run_id: Any) -> Optional[bytes]:
+        """Encode the part of a run's stream events that follows the timestamp.
+
+        Returns None when orjson is unavailable or cannot encode ``run_id``, in
+        which case output_stream serialises each event as a whole.
+        """
+        if orjson is None:
+            return None
+        try:
+            return b'","run_id":' + orjson.dumps(run_id) + b',"payload":'
+        except orjson.JSONEncodeError:
+            return None
+
+    def output_stream(self, envelope: Optional[bytes], run_id: Any, payload: Dict[str, Any]) -> None:
+        """Emit a stream event, encoding only the payload when ``envelope`` is set."""
+        timestamp = _utc_now_iso()
+        if envelope is not None:
+            try:
+                encoded = orjson.dumps(
+                    payload, default=self._json_default, option=orjson.OPT_NON_STR_KEYS
+                )
+            except orjson.JSONEncodeError:
+                pass  # let output_json retry with the stdlib encoder
+            else:
+                self._emit(
+                    b"".join((_STREAM_EVENT_HEAD, timestamp.encode(), envelope, encoded, b"}\n"))
+                )
+                return
+
+        self.output_json(
+            {
+                "event": "stream",
+                "timestamp": timestamp,
+                "run_id": run_id,
+                "payload": payload,
             }
-        return str(obj)
+        )
+
+    @staticmethod
+    def _json_default(obj: Any) -> Any:
+        return _default_encoder(type(obj))(obj)
 
     # ---------------------------------------------------------------------
     # Option parsing
@@ -117,8 +469,7 @@ class ClaudeCodeWrapper:
     def build_options(self, raw_options: Optional[Dict[str, Any]]) -> ClaudeCodeOptions:
         raw_options = raw_options or {}
 
-        allowed_params = set(self._options_signature.parameters.keys()) - {"self"}
-        filtered = {k: raw_options[k] for k in raw_options if k in allowed_params}
+        filtered = {k: v for k, v in raw_options.items() if k in self._allowed_option_keys}
 
         # Support backward compatibility for "working_directory" alias
         if "cwd" not in filtered and "working_directory" in raw_options:
@@ -126,18 +477,25 @@ class ClaudeCodeWrapper:
 
         # Backwards compatibility for legacy permission modes
         legacy_permission_mode = filtered.get("permission_mode")
-        if legacy_permission_mode == "acceptAll":
+        if isinstance(legacy_permission_mode, str) and legacy_permission_mode in _LEGACY_PERMISSION_MODES:
+            permission_mode = _LEGACY_PERMISSION_MODES[legacy_permission_mode]
             logger.warning(
-                "permission_mode 'acceptAll' is deprecated; using 'bypassPermissions'"
+                "permission_mode '%s' is deprecated; using '%s'",
+                legacy_permission_mode,
+                permission_mode,
             )
-            filtered["permission_mode"] = "bypassPermissions"
+            filtered["permission_mode"] = permission_mode
 
         # Persist session reuse when requested via "resume_session"
         if raw_options.get("resume_last_session") and self.last_session_id:
             filtered.setdefault("session_id", self.last_session_id)
 
-        options = ClaudeCodeOptions(**filtered)  # type: ignore[call-arg]
-        return options
+        key = tuple(sorted(filtered.items()))
+        try:
+            hash(key)
+        except TypeError:  # list/dict values, e.g. allowed_tools or mcp_servers
+            return ClaudeCodeOptions(**filtered)  # type: ignore[call-arg]
+        return _options_for(key)
 
     # ---------------------------------------------------------------------
     # Command handling
@@ -153,33 +511,37 @@ class ClaudeCodeWrapper:
             if "working_directory" in payload and "cwd" not in (options or {}):
                 options["cwd"] = payload["working_directory"]
 
-        if action == "prompt":
-            await self.handle_prompt(payload)
-        elif action == "cancel":
-            await self.handle_cancel(payload)
-        elif action == "status":
-            self.output_status()
-        elif action == "shutdown":
-            logger.info("Shutdown command received")
-            self.shutdown_requested = True
-            if self.current_run and self.current_run.get("cancel_scope") is not None:
-                self.current_run["cancel_scope"].cancel()
-        else:
+        try:
+            handler = self._command_handlers.get(action)
+        except TypeError:  # unhashable action, e.g. a list
+            handler = None
+        if handler is None:
             self.output_json(
                 {
                     "event": "error",
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": _utc_now_iso(),
                     "error": "Unknown action",
                     "payload": action,
                 }
             )
+            return
+        await handler(payload)
+
+    async def handle_status(self, payload: Dict[str, Any]) -> None:
+        self.output_status()
+
+    async def handle_shutdown(self, payload: Dict[str, Any]) -> None:
+        logger.info("Shutdown command received")
+        self.shutdown_requested = True
+        if self.current_run and self.current_run.get("cancel_scope") is not None:
+            self.current_run["cancel_scope"].cancel()
 
     async def handle_prompt(self, payload: Dict[str, Any]) -> None:
         if self.current_run is not None:
             self.output_json(
                 {
                     "event": "error",
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": _utc_now_iso(),
                     "error": "Agent is busy",
                     "state": self.state,
                     "active_run_id": self.current_run.get("id") if self.current_run else None,
@@ -189,16 +551,10 @@ class ClaudeCodeWrapper:
 
         prompt = payload.get("prompt")
         if not prompt:
-            self.output_json(
-                {
-                    "event": "error",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "error": "Missing prompt",
-                }
-            )
+            self.output_event(_MISSING_PROMPT)
             return
 
-        run_id = payload.get("run_id") or str(uuid.uuid4())
+        run_id = payload.get("run_id") or uuid.uuid4().hex
         options_dict = payload.get("options") or {}
         exit_on_complete = bool(options_dict.get("exit_on_complete"))
 
@@ -209,7 +565,7 @@ class ClaudeCodeWrapper:
             self.output_json(
                 {
                     "event": "error",
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": _utc_now_iso(),
                     "error": "Invalid ClaudeCodeOptions",
                     "details": str(exc),
                 }
@@ -218,9 +574,9 @@ class ClaudeCodeWrapper:
 
         run_context: Dict[str, Any] = {
             "id": run_id,
-            "prompt_digest": prompt[:120],
+            "prompt": prompt,
             "options": options_dict,
-            "started_at": datetime.utcnow().isoformat(),
+            "started_at": _utc_now_iso(),
             "state": "executing",
             "exit_on_complete": exit_on_complete,
         }
@@ -234,7 +590,7 @@ class ClaudeCodeWrapper:
             {
                 "event": "run_started",
                 "run_id": run_id,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": _utc_now_iso(),
                 "options": options_dict,
                 "state": self.state,
             }
@@ -250,7 +606,7 @@ class ClaudeCodeWrapper:
                 {
                     "event": "cancel_ignored",
                     "reason": "no_active_run",
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": _utc_now_iso(),
                     "requested_run_id": requested_run_id,
                 }
             )
@@ -261,7 +617,7 @@ class ClaudeCodeWrapper:
                 {
                     "event": "cancel_ignored",
                     "reason": "run_id_mismatch",
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": _utc_now_iso(),
                     "requested_run_id": requested_run_id,
                     "active_run_id": self.current_run.get("id"),
                 }
@@ -270,20 +626,14 @@ class ClaudeCodeWrapper:
 
         cancel_scope = self.current_run.get("cancel_scope")
         if cancel_scope is None:
-            self.output_json(
-                {
-                    "event": "cancel_ignored",
-                    "reason": "not_cancellable",
-                    "timestamp": datetime.utcnow().isoformat(),
-                }
-            )
+            self.output_event(_CANCEL_NOT_CANCELLABLE)
             return
 
         cancel_scope.cancel()
         self.output_json(
             {
                 "event": "cancel_requested",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": _utc_now_iso(),
                 "run_id": self.current_run.get("id"),
             }
         )
@@ -291,16 +641,19 @@ class ClaudeCodeWrapper:
     def output_status(self) -> None:
         status_payload: Dict[str, Any] = {
             "event": "status",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _utc_now_iso(),
             "state": self.state,
             "last_session_id": self.last_session_id,
         }
         if self.current_run:
-            status_payload["active_run"] = {
-                key: value
-                for key, value in self.current_run.items()
-                if key not in {"cancel_scope"}
-            }
+            active_run: Dict[str, Any] = {}
+            for key, value in self.current_run.items():
+                if key == "prompt":
+                    # Only status reports the prompt, so truncate it here
+                    active_run["prompt_digest"] = value[:120]
+                elif key != "cancel_scope":
+                    active_run[key] = value
+            status_payload["active_run"] = active_run
         self.output_json(status_payload)
 
     # ---------------------------------------------------------------------
@@ -313,6 +666,9 @@ class ClaudeCodeWrapper:
         options: ClaudeCodeOptions,
     ) -> None:
         cancel_scope: Optional[anyio.CancelScope] = None
+        # The SDK reports one session id per run; stop looking once it is known
+        session_captured = False
+        stream_envelope = self._stream_envelope(run_context["id"])
 
         try:
             with anyio.CancelScope() as scope:
@@ -321,20 +677,15 @@ class ClaudeCodeWrapper:
 
                 async for message in query(prompt=prompt, options=options):  # type: ignore[misc]
                     serialised = self.serialise_message(message)
-                    self.output_json(
-                        {
-                            "event": "stream",
-                            "timestamp": datetime.utcnow().isoformat(),
-                            "run_id": run_context["id"],
-                            "payload": serialised,
-                        }
-                    )
+                    self.output_stream(stream_envelope, run_context["id"], serialised)
 
                     # Capture session id when available
-                    session_id = self._extract_session_id(serialised)
-                    if session_id:
-                        self.last_session_id = session_id
-                        run_context["session_id"] = session_id
+                    if not session_captured:
+                        session_id = self._extract_session_id(serialised)
+                        if session_id:
+                            self.last_session_id = session_id
+                            run_context["session_id"] = session_id
+                            session_captured = True
 
                     # Detect rate/usage limit notice in the stream and remember it
                     try:
@@ -347,24 +698,14 @@ class ClaudeCodeWrapper:
                         self.output_json(
                             {
                                 "event": "limit_notice",
-                                "timestamp": datetime.utcnow().isoformat(),
+                                "timestamp": _utc_now_iso(),
                                 "run_id": run_context["id"],
                                 "message": limit_msg,
                             }
                         )
 
         except anyio.get_cancelled_exc_class():
-            self.output_json(
-                {
-                    "event": "run_cancelled",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "run_id": run_context["id"],
-                    "version": 1,
-                    "outcome": "cancelled",
-                    "reason": "cancel_requested",
-                    "tags": [],
-                }
-            )
+            self.output_event(_RUN_CANCELLED, run_context["id"])
         except ProcessError as exc:  # type: ignore[has-type]
             text = str(exc)
             if "EPIPE" in text or "Broken pipe" in text:
@@ -372,7 +713,7 @@ class ClaudeCodeWrapper:
                 self.output_json(
                     {
                         "event": "run_terminated",
-                        "timestamp": datetime.utcnow().isoformat(),
+                        "timestamp": _utc_now_iso(),
                         "run_id": run_context["id"],
                         "reason": "broken_pipe",
                         "version": 1,
@@ -387,7 +728,7 @@ class ClaudeCodeWrapper:
                     self.output_json(
                         {
                             "event": "run_completed",
-                            "timestamp": datetime.utcnow().isoformat(),
+                            "timestamp": _utc_now_iso(),
                             "run_id": run_context["id"],
                             "version": 1,
                             "outcome": "completed",
@@ -400,7 +741,7 @@ class ClaudeCodeWrapper:
                         self.output_json(
                             {
                                 "event": "auto_shutdown",
-                                "timestamp": datetime.utcnow().isoformat(),
+                                "timestamp": _utc_now_iso(),
                                 "reason": "exit_on_complete",
                                 "run_id": run_context["id"],
                                 "version": 1,
@@ -422,7 +763,7 @@ class ClaudeCodeWrapper:
                     self.output_json(
                         {
                             "event": "run_failed",
-                            "timestamp": datetime.utcnow().isoformat(),
+                            "timestamp": _utc_now_iso(),
                             "run_id": run_context["id"],
                             "version": 1,
                             "outcome": "failed",
@@ -439,7 +780,7 @@ class ClaudeCodeWrapper:
                 self.output_json(
                     {
                         "event": "run_completed",
-                        "timestamp": datetime.utcnow().isoformat(),
+                        "timestamp": _utc_now_iso(),
                         "run_id": run_context["id"],
                         "version": 1,
                         "outcome": "completed",
@@ -452,7 +793,7 @@ class ClaudeCodeWrapper:
                     self.output_json(
                         {
                             "event": "auto_shutdown",
-                            "timestamp": datetime.utcnow().isoformat(),
+                            "timestamp": _utc_now_iso(),
                             "reason": "exit_on_complete",
                             "run_id": run_context["id"],
                             "version": 1,
@@ -474,35 +815,33 @@ class ClaudeCodeWrapper:
                 self.output_json(
                     {
                         "event": "run_failed",
-                        "timestamp": datetime.utcnow().isoformat(),
+                        "timestamp": _utc_now_iso(),
                         "run_id": run_context["id"],
                         "version": 1,
                         "outcome": "failed",
                         "reason": "unexpected",
                         "tags": [],
                         "error": str(exc),
-                        "traceback": traceback.format_exc(limit=20),
+                        "traceback": (
+                            "".join(
+                                traceback.format_exception(
+                                    type(exc), exc, exc.__traceback__, limit=_TRACEBACK_LIMIT
+                                )
+                            )
+                            if _TRACEBACK_LIMIT
+                            else None
+                        ),
                     }
                 )
         else:
             logger.info("run_completed id=%s", run_context["id"])
-            self.output_json(
-                {
-                    "event": "run_completed",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "run_id": run_context["id"],
-                    "version": 1,
-                    "outcome": "completed",
-                    "reason": "ok",
-                    "tags": [],
-                }
-            )
+            self.output_event(_RUN_COMPLETED, run_context["id"])
             # If requested, gracefully shut down the wrapper immediately after completion
             if run_context.get("exit_on_complete"):
                 self.output_json(
                     {
                         "event": "auto_shutdown",
-                        "timestamp": datetime.utcnow().isoformat(),
+                        "timestamp": _utc_now_iso(),
                         "reason": "exit_on_complete",
                         "run_id": run_context["id"],
                     }
@@ -533,33 +872,23 @@ class ClaudeCodeWrapper:
             self.output_json(
                 {
                     "event": "state",
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": _utc_now_iso(),
                     "state": self.state,
                     "last_session_id": self.last_session_id,
                 }
             )
 
     def serialise_message(self, message: Any) -> Dict[str, Any]:
-        if isinstance(message, dict):
-            result = dict(message)
-        elif dataclasses.is_dataclass(message):
-            result = dataclasses.asdict(message)
-        elif hasattr(message, "model_dump"):
-            result = message.model_dump()  # type: ignore[misc]
-        else:
-            public_attrs = {
-                key: getattr(message, key)
-                for key in dir(message)
-                if not key.startswith("_") and not callable(getattr(message, key))
-            }
-            result = public_attrs or {"repr": repr(message)}
-
+        result = _message_extractor(type(message))(message)
         result.setdefault("message_type", getattr(message, "type", message.__class__.__name__))
         return result
 
     @staticmethod
     def _detect_limit_message(serialised_message: Dict[str, Any]) -> Optional[str]:
         """Detect textual rate/usage limit notice within a Claude SDK stream payload."""
+        if _LIMIT_SOURCE_KEYS.isdisjoint(serialised_message):
+            return None
+
         candidates: list[str] = []
 
         def push(value: Any) -> None:
@@ -579,28 +908,25 @@ class ClaudeCodeWrapper:
         content = serialised_message.get("content")
         if isinstance(content, list):
             for item in content[:5]:
+                # Content blocks stay dataclasses after shallow serialisation
                 if isinstance(item, dict):
                     push(item.get("text"))
+                else:
+                    push(getattr(item, "text", None))
 
-        import re
-
-        pattern = re.compile(r"(limit\s*reached|rate\s*limit|usage\s*limit)", re.IGNORECASE)
         for text in candidates:
-            if pattern.search(text):
+            # Every alternative of the pattern contains "limit"
+            if "limit" in text.lower() and _LIMIT_NOTICE_RE.search(text):
                 return text
         return None
 
     @staticmethod
     def _extract_session_id(serialised_message: Dict[str, Any]) -> Optional[str]:
         session_id = serialised_message.get("session_id")
-        if isinstance(session_id, str):
-            return session_id
-
-        metadata = serialised_message.get("metadata")
-        if isinstance(metadata, dict) and isinstance(metadata.get("session_id"), str):
-            return metadata["session_id"]
-
-        return None
+        if not isinstance(session_id, str):
+            metadata = serialised_message.get("metadata")
+            session_id = metadata.get("session_id") if isinstance(metadata, dict) else None
+        return session_id if isinstance(session_id, str) else None
 
     # ---------------------------------------------------------------------
     # Main loop
@@ -610,7 +936,7 @@ class ClaudeCodeWrapper:
         self.output_json(
             {
                 "event": "ready",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": _utc_now_iso(),
                 "state": self.state,
                 "version": 1,
                 "outcome": "running",
@@ -619,16 +945,29 @@ class ClaudeCodeWrapper:
             }
         )
 
-        async with anyio.create_task_group() as task_group:
-            self.task_group = task_group
-            await self._command_loop()
+        # Unbounded: output_json is synchronous, so it has no way to wait for room
+        # in the channel
+        send_stream, receive_stream = anyio.create_memory_object_stream(math.inf)
+        async with anyio.create_task_group() as writer_group:
+            writer_group.start_soon(self._write_events, receive_stream)
+            writer_group.start_soon(self._watch_signals)
+            self._event_send = send_stream
+            try:
+                async with anyio.create_task_group() as task_group:
+                    self.task_group = task_group
+                    await self._command_loop()
 
-        await self._await_run_completion()
+                await self._await_run_completion()
+            finally:
+                self._event_send = None
+                send_stream.close()
+                # Stops the signal watcher; the shielded writer drains what is queued
+                writer_group.cancel_scope.cancel()
 
         self.output_json(
             {
                 "event": "shutdown",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": _utc_now_iso(),
                 "state": self.state,
                 "last_session_id": self.last_session_id,
                 "version": 1,
@@ -642,39 +981,84 @@ class ClaudeCodeWrapper:
     async def _command_loop(self) -> None:
         while not self.shutdown_requested:
             try:
-                line = await anyio.to_thread.run_sync(sys.stdin.readline)
+                lines = await anyio.to_thread.run_sync(self._read_stdin_lines)
             except (OSError, RuntimeError):  # pragma: no cover - defensive
                 logger.error("Failed to read from stdin", exc_info=True)
                 break
 
-            if line == "":
+            if not lines:
                 logger.info("EOF detected on stdin")
                 self.shutdown_requested = True
                 break
 
-            line = line.strip()
-            if not line:
-                continue
+            for line in lines:
+                if self.shutdown_requested:
+                    break
+                await self._process_line(line)
+
+        # Shut down gracefully when loop exits
+        if self.current_run and self.current_run.get("cancel_scope") is not None:
+            self.current_run["cancel_scope"].cancel()
 
+    def _read_stdin_lines(self) -> list[bytes]:
+        """Block until stdin has data and return every complete line received.
+
+        A single ``os.read`` drains whatever the producer has written so far, so
+        a burst of commands costs one worker-thread hop instead of one per line.
+        Returns an empty list at EOF.
+        """
+        while True:
+            chunk = os.read(self._stdin_fd, 65536)
+            if not chunk:
+                tail, self._stdin_buffer = self._stdin_buffer, b""
+                return [tail] if tail else []
+            lines = (self._stdin_buffer + chunk).split(b"\n")
+            # Keep the trailing partial line for the next read
+            self._stdin_buffer = lines.pop()
+            if lines:
+                return lines
+
+    async def _process_line(self, raw: bytes) -> None:
+        line = raw.strip()
+        if not line:
+            return
+
+        try:
+            # Parse the bytes as read; orjson takes them without a decode step
+            payload = _json_loads(line)
+        except ValueError:
+            # Invalid UTF-8, non-ASCII whitespace or malformed JSON: retry on the
+            # decoded text so the outcome and error details match text input
+            text = raw.decode("utf-8", "replace").strip()
             try:
-                payload = json.loads(line)
+                payload = _json_loads(text)
             except json.JSONDecodeError as exc:
                 self.output_json(
                     {
                         "event": "error",
-                        "timestamp": datetime.utcnow().isoformat(),
+                        "timestamp": _utc_now_iso(),
                         "error": "Invalid JSON payload",
                         "details": str(exc),
-                        "raw": line,
+                        "raw": text,
                     }
                 )
-                continue
+                return
 
-            await self.handle_command(payload)
+        # The only envelope requirement is a JSON object; everything else is
+        # checked per action in handle_command
+        if not isinstance(payload, dict):
+            self.output_json(
+                {
+                    "event": "error",
+                    "timestamp": _utc_now_iso(),
+                    "error": "Invalid command payload",
+                    "details": "expected a JSON object",
+                    "raw": raw.decode("utf-8", "replace").strip(),
+                }
+            )
+            return
 
-        # Shut down gracefully when loop exits
-        if self.current_run and self.current_run.get("cancel_scope") is not None:
-            self.current_run["cancel_scope"].cancel()
+        await self.handle_command(payload)
 
     async def _await_run_completion(self) -> None:
         if self.current_run_done_event is not None:
@@ -685,31 +1069,36 @@ class ClaudeCodeWrapper:
         await anyio.sleep(0.2)
 
 
-def main() -> None:
-    if CLAUDE_IMPORT_ERROR:
-        logger.error("claude_code_sdk import failed: %s", CLAUDE_IMPORT_ERROR)
-        error_payload = {
-            "event": "fatal",
-            "timestamp": datetime.utcnow().isoformat(),
-            "error": "claude_code_sdk import failed",
-            "details": str(CLAUDE_IMPORT_ERROR),
-        }
-        print(json.dumps(error_payload, ensure_ascii=False), flush=True)
-        sys.exit(1)
+def _finish_stdout() -> None:
+    """Terminate the gzip stream, if any, so the output is a complete gzip file."""
+    global _gzip_stdout
+    if _gzip_stdout is not None:
+        trailer, _gzip_stdout = _gzip_stdout.flush(), None
+        _write_stdout(trailer)
 
+
+def _emit_fatal(error: str, **fields: Any) -> None:
+    """Write a ``fatal`` event directly to stdout; the wrapper is not running."""
+    payload = {"event": "fatal", "timestamp": _utc_now_iso(), "error": error, **fields}
+    _write_stdout((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+def main() -> None:
     try:
-        wrapper = ClaudeCodeWrapper()
-        anyio.run(wrapper.run)
-    except Exception as exc:  # pragma: no cover - defensive
-        logger.error("Fatal error in Claude wrapper", exc_info=True)
-        error_payload = {
-            "event": "fatal",
-            "timestamp": datetime.utcnow().isoformat(),
-            "error": str(exc),
-            "traceback": traceback.format_exc(limit=20),
-        }
-        print(json.dumps(error_payload, ensure_ascii=False), flush=True)
-        sys.exit(1)
+        if CLAUDE_IMPORT_ERROR:
+            logger.error("claude_code_sdk import failed: %s", CLAUDE_IMPORT_ERROR)
+            _emit_fatal("claude_code_sdk import failed", details=str(CLAUDE_IMPORT_ERROR))
+            sys.exit(1)
+
+        try:
+            wrapper = ClaudeCodeWrapper()
+            anyio.run(wrapper.run)
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.error("Fatal error in Claude wrapper", exc_info=True)
+            _emit_fatal(str(exc), traceback=traceback.format_exc(limit=20))
+            sys.exit(1)
+    finally:
+        _finish_stdout()
 
 
 if __name__ == "__main__":